@@ -1,10 +1,397 @@
-import tkinter as tk
-from tkinter import messagebox
 import random
 import copy
+import math
+import os
+import sys
+import time
+import argparse
+import json
+import threading
+from multiprocessing import Pool
 
-class ChessGame:
+try:
+    import tkinter as tk
+    from tkinter import messagebox
+except ImportError:
+    # --uci and --selfplay never open the board, so they work without Tk
+    tk = None
+
+
+class SearchAborted(Exception):
+    """Raised inside the search when the time limit or stop flag is hit"""
+
+
+class ChessEngine:
+    """Board state, move generation and search, independent of the Tk UI"""
+    
+    PIECE_VALUES = {'pawn': 1, 'knight': 3, 'bishop': 3, 'rook': 5, 'queen': 9, 'king': 100}
+    CENTER_BONUS = [[(4 - max(abs(3.5 - r), abs(3.5 - c))) * 0.5 for c in range(8)] for r in range(8)]
+    MATE_SCORE = 100000
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        # Game state
+        self.board = self.create_initial_board()
+        self.current_player = 'white'
+        self.game_over = False
+        self.winner = None
+        self.white_king_pos = (7, 4)
+        self.black_king_pos = (0, 4)
+        
+        # Move history for basic AI
+        self.move_history = []
+        
+        # Search state
+        self.nodes = 0
+        self.deadline = None
+        self.stop_event = None
+    
+    def create_initial_board(self):
+        # Create 8x8 board with initial piece positions
+        board = [[None for _ in range(8)] for _ in range(8)]
+        
+        # Black pieces (top)
+        board[0] = [('black', 'rook'), ('black', 'knight'), ('black', 'bishop'), ('black', 'queen'),
+                   ('black', 'king'), ('black', 'bishop'), ('black', 'knight'), ('black', 'rook')]
+        board[1] = [('black', 'pawn') for _ in range(8)]
+        
+        # White pieces (bottom)
+        board[7] = [('white', 'rook'), ('white', 'knight'), ('white', 'bishop'), ('white', 'queen'),
+                   ('white', 'king'), ('white', 'bishop'), ('white', 'knight'), ('white', 'rook')]
+        board[6] = [('white', 'pawn') for _ in range(8)]
+        
+        return board
+    
+    def find_computer_move(self):
+        """Find best computer move efficiently"""
+        moves = []
+        
+        # Find all pieces for current player and their possible moves
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece and piece[0] == self.current_player:
+                    piece_moves = self.get_piece_moves(row, col, piece[1])
+                    for end_row, end_col in piece_moves:
+                        if self.is_valid_move(row, col, end_row, end_col):
+                            # Score this move
+                            score = self.score_move(row, col, end_row, end_col)
+                            moves.append((score, row, col, end_row, end_col))
+        
+        if not moves:
+            return None
+        
+        # Sort by score and pick from top moves
+        moves.sort(reverse=True)
+        top_moves = moves[:min(3, len(moves))]
+        chosen = random.choice(top_moves)
+        return chosen[1:]  # Return (start_row, start_col, end_row, end_col)
+    
+    def get_piece_moves(self, row, col, piece_type):
+        """Get possible moves for a piece type"""
+        moves = []
+        
+        if piece_type == 'pawn':
+            # Pawn direction based on color
+            direction = -1 if self.board[row][col][0] == 'white' else 1
+            start_rank = 6 if self.board[row][col][0] == 'white' else 1
+            
+            # Forward moves
+            if 0 <= row + direction < 8 and not self.board[row + direction][col]:
+                moves.append((row + direction, col))
+                if row == start_rank and not self.board[row + 2 * direction][col]:
+                    moves.append((row + 2 * direction, col))
+            
+            # Captures
+            for dc in [-1, 1]:
+                if 0 <= col + dc < 8 and 0 <= row + direction < 8:
+                    target = self.board[row + direction][col + dc]
+                    if target and target[0] != self.board[row][col][0]:
+                        moves.append((row + direction, col + dc))
+        
+        elif piece_type == 'knight':
+            knight_moves = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+            for dr, dc in knight_moves:
+                new_row, new_col = row + dr, col + dc
+                if 0 <= new_row < 8 and 0 <= new_col < 8:
+                    moves.append((new_row, new_col))
+        
+        elif piece_type == 'king':
+            for dr in [-1, 0, 1]:
+                for dc in [-1, 0, 1]:
+                    if dr == 0 and dc == 0:
+                        continue
+                    new_row, new_col = row + dr, col + dc
+                    if 0 <= new_row < 8 and 0 <= new_col < 8:
+                        moves.append((new_row, new_col))
+        
+        else:
+            # Sliding pieces
+            directions = []
+            if piece_type in ['rook', 'queen']:
+                directions.extend([(0, 1), (0, -1), (1, 0), (-1, 0)])
+            if piece_type in ['bishop', 'queen']:
+                directions.extend([(1, 1), (1, -1), (-1, 1), (-1, -1)])
+            
+            for dr, dc in directions:
+                for i in range(1, 8):
+                    new_row, new_col = row + dr * i, col + dc * i
+                    if 0 <= new_row < 8 and 0 <= new_col < 8:
+                        moves.append((new_row, new_col))
+                        if self.board[new_row][new_col]:  # Stop at piece
+                            break
+                    else:
+                        break
+        
+        return moves
+    
+    def score_move(self, start_row, start_col, end_row, end_col):
+        """Score a move for the computer"""
+        score = 1
+        target = self.board[end_row][end_col]
+        
+        if target:  # Capture
+            piece_values = {'pawn': 1, 'knight': 3, 'bishop': 3, 'rook': 5, 'queen': 9, 'king': 100}
+            score += piece_values.get(target[1], 1) * 10
+        
+        # Center control bonus
+        center_distance = max(abs(3.5 - end_row), abs(3.5 - end_col))
+        score += (4 - center_distance) * 0.5
+        
+        return score
+    
+    def is_valid_move(self, start_row, start_col, end_row, end_col):
+        # Basic bounds check
+        if not (0 <= end_row < 8 and 0 <= end_col < 8):
+            return False
+            
+        piece = self.board[start_row][start_col]
+        if not piece:
+            return False
+            
+        color, piece_type = piece
+        target = self.board[end_row][end_col]
+        
+        # Can't capture own piece
+        if target and target[0] == color:
+            return False
+        
+        # Basic piece movement rules
+        dr, dc = end_row - start_row, end_col - start_col
+        
+        if piece_type == 'pawn':
+            direction = -1 if color == 'white' else 1
+            start_rank = 6 if color == 'white' else 1
+            
+            if dc == 0:  # Moving forward
+                if dr == direction and not target:
+                    return True
+                if start_row == start_rank and dr == 2 * direction and not target:
+                    return True
+            elif abs(dc) == 1 and dr == direction and target:  # Capturing
+                return True
+                
+        elif piece_type == 'rook':
+            if dr == 0 or dc == 0:
+                return self.is_path_clear(start_row, start_col, end_row, end_col)
+                
+        elif piece_type == 'bishop':
+            if abs(dr) == abs(dc):
+                return self.is_path_clear(start_row, start_col, end_row, end_col)
+                
+        elif piece_type == 'queen':
+            if dr == 0 or dc == 0 or abs(dr) == abs(dc):
+                return self.is_path_clear(start_row, start_col, end_row, end_col)
+                
+        elif piece_type == 'knight':
+            return (abs(dr) == 2 and abs(dc) == 1) or (abs(dr) == 1 and abs(dc) == 2)
+            
+        elif piece_type == 'king':
+            return abs(dr) <= 1 and abs(dc) <= 1
+            
+        return False
+    
+    def is_path_clear(self, start_row, start_col, end_row, end_col):
+        dr = 0 if end_row == start_row else (1 if end_row > start_row else -1)
+        dc = 0 if end_col == start_col else (1 if end_col > start_col else -1)
+        
+        r, c = start_row + dr, start_col + dc
+        while (r, c) != (end_row, end_col):
+            if self.board[r][c] is not None:
+                return False
+            r, c = r + dr, c + dc
+            
+        return True
+    
+    def get_legal_moves(self, color=None):
+        """All (start_row, start_col, end_row, end_col) moves for color (default: side to move)"""
+        color = color or self.current_player
+        moves = []
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece and piece[0] == color:
+                    for end_row, end_col in self.get_piece_moves(row, col, piece[1]):
+                        if self.is_valid_move(row, col, end_row, end_col):
+                            moves.append((row, col, end_row, end_col))
+        return moves
+    
+    def push_move(self, start_row, start_col, end_row, end_col):
+        """Apply a move, record it and pass the turn. Returns the captured piece, if any"""
+        piece = self.board[start_row][start_col]
+        captured = self.board[end_row][end_col]
+        
+        # Update king position
+        if piece and piece[1] == 'king':
+            if piece[0] == 'white':
+                self.white_king_pos = (end_row, end_col)
+            else:
+                self.black_king_pos = (end_row, end_col)
+        
+        # Make the move
+        self.board[end_row][end_col] = piece
+        self.board[start_row][start_col] = None
+        
+        # Record move
+        move_str = f"{self.current_player}: {chr(ord('a')+start_col)}{8-start_row} to {chr(ord('a')+end_col)}{8-end_row}"
+        if captured:
+            move_str += f" (captured {captured[1]})"
+        self.move_history.append(move_str)
+        
+        # Capturing the king ends the game
+        if captured and captured[1] == 'king':
+            self.winner = self.current_player
+            self.game_over = True
+            return captured
+        
+        # Switch turns
+        self.current_player = 'black' if self.current_player == 'white' else 'white'
+        return captured
+    
+    def evaluate(self, color):
+        """Static evaluation from color's point of view, in the same units as score_move"""
+        score = 0.0
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece:
+                    value = self.PIECE_VALUES[piece[1]] * 10 + self.CENTER_BONUS[row][col]
+                    score += value if piece[0] == color else -value
+        return score
+    
+    def ordered_moves(self, color):
+        """Legal moves with the most valuable captures first, to make alpha-beta cut early"""
+        moves = self.get_legal_moves(color)
+        def capture_gain(move):
+            target = self.board[move[2]][move[3]]
+            if not target:
+                return 0
+            attacker = self.board[move[0]][move[1]]
+            return self.PIECE_VALUES[target[1]] * 10 - self.PIECE_VALUES[attacker[1]]
+        moves.sort(key=capture_gain, reverse=True)
+        return moves
+    
+    def search(self, max_depth=None, movetime=None, stop_event=None, info_callback=None):
+        """Iterative-deepening alpha-beta search for the side to move.
+
+        Stops after max_depth plies, after movetime seconds or once
+        stop_event is set, and returns a dict with the best move of the
+        deepest completed iteration plus score, depth, nodes and time.
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.deadline = start + movetime if movetime is not None else None
+        self.stop_event = stop_event
+        if max_depth is None:
+            max_depth = 64 if (movetime is not None or stop_event) else 3
+        
+        result = {'move': None, 'score': 0, 'depth': 0, 'nodes': 0, 'time': 0.0}
+        moves = self.ordered_moves(self.current_player)
+        if moves:
+            # Something to play even if the first iteration is cut short
+            result['move'] = moves[0]
+        
+        saved_board = [row[:] for row in self.board]
+        for depth in range(1, max_depth + 1):
+            if not moves:
+                break
+            try:
+                score, move = self.search_root(moves, depth)
+            except SearchAborted:
+                self.board = saved_board
+                break
+            result.update(move=move, score=score, depth=depth)
+            
+            # Try the previous best move first on the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+            
+            if info_callback:
+                info_callback(dict(result, nodes=self.nodes, time=time.perf_counter() - start))
+            if abs(score) >= self.MATE_SCORE:
+                break  # Forced king capture found, deeper search cannot change it
+        
+        result['nodes'] = self.nodes
+        result['time'] = time.perf_counter() - start
+        self.deadline = None
+        self.stop_event = None
+        return result
+    
+    def search_root(self, moves, depth):
+        color = self.current_player
+        opponent = 'black' if color == 'white' else 'white'
+        alpha, beta = -self.MATE_SCORE * 10, self.MATE_SCORE * 10
+        best_move = moves[0]
+        for move in moves:
+            score = self.search_move(move, depth, -beta, -alpha, opponent)
+            if score > alpha:
+                alpha, best_move = score, move
+        return alpha, best_move
+    
+    def search_move(self, move, depth, alpha, beta, opponent):
+        """Score one move for the mover by making it, searching the reply and unmaking it"""
+        start_row, start_col, end_row, end_col = move
+        piece = self.board[start_row][start_col]
+        captured = self.board[end_row][end_col]
+        if captured and captured[1] == 'king':
+            # Earlier king captures score higher
+            return self.MATE_SCORE + depth
+        self.board[end_row][end_col] = piece
+        self.board[start_row][start_col] = None
+        score = -self.negamax(depth - 1, alpha, beta, opponent)
+        self.board[start_row][start_col] = piece
+        self.board[end_row][end_col] = captured
+        return score
+    
+    def negamax(self, depth, alpha, beta, color):
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            if self.deadline and time.perf_counter() >= self.deadline:
+                raise SearchAborted()
+            if self.stop_event and self.stop_event.is_set():
+                raise SearchAborted()
+        
+        if depth == 0:
+            return self.evaluate(color)
+        
+        opponent = 'black' if color == 'white' else 'white'
+        moves = self.ordered_moves(color)
+        if not moves:
+            return 0
+        for move in moves:
+            score = self.search_move(move, depth, -beta, -alpha, opponent)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+
+class ChessGame(ChessEngine):
     def __init__(self):
+        super().__init__()
         self.window = tk.Tk()
         self.window.title("Chess Game")
         self.window.geometry("600x700")
@@ -22,40 +409,16 @@ class ChessGame:
             }
         }
         
-        # Game state
-        self.board = self.create_initial_board()
-        self.current_player = 'white'
+        # UI state
         self.selected_square = None
-        self.game_over = False
-        self.white_king_pos = (7, 4)
-        self.black_king_pos = (0, 4)
         self.computer_thinking = False
         
         # Game modes
         self.auto_play_mode = False  # Computer vs Computer
-        self.human_vs_computer = True  # Default: Human vs Computer
-        
-        # Move history for basic AI
-        self.move_history = []
-        
-        self.create_widgets()
-        
-    def create_initial_board(self):
-        # Create 8x8 board with initial piece positions
-        board = [[None for _ in range(8)] for _ in range(8)]
-        
-        # Black pieces (top)
-        board[0] = [('black', 'rook'), ('black', 'knight'), ('black', 'bishop'), ('black', 'queen'),
-                   ('black', 'king'), ('black', 'bishop'), ('black', 'knight'), ('black', 'rook')]
-        board[1] = [('black', 'pawn') for _ in range(8)]
+        self.human_vs_computer = True  # Default: Human vs Computer
         
-        # White pieces (bottom)
-        board[7] = [('white', 'rook'), ('white', 'knight'), ('white', 'bishop'), ('white', 'queen'),
-                   ('white', 'king'), ('white', 'bishop'), ('white', 'knight'), ('white', 'rook')]
-        board[6] = [('white', 'pawn') for _ in range(8)]
+        self.create_widgets()
         
-        return board
-    
     def create_widgets(self):
         # Title
         title_label = tk.Label(self.window, text="Chess Game", 
@@ -267,187 +630,8 @@ class ChessGame:
         self.update_display()
         self.update_status_for_human_turn()
     
-    def find_computer_move(self):
-        """Find best computer move efficiently"""
-        moves = []
-        
-        # Find all pieces for current player and their possible moves
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece and piece[0] == self.current_player:
-                    piece_moves = self.get_piece_moves(row, col, piece[1])
-                    for end_row, end_col in piece_moves:
-                        if self.is_valid_move(row, col, end_row, end_col):
-                            # Score this move
-                            score = self.score_move(row, col, end_row, end_col)
-                            moves.append((score, row, col, end_row, end_col))
-        
-        if not moves:
-            return None
-        
-        # Sort by score and pick from top moves
-        moves.sort(reverse=True)
-        top_moves = moves[:min(3, len(moves))]
-        chosen = random.choice(top_moves)
-        return chosen[1:]  # Return (start_row, start_col, end_row, end_col)
-    
-    def get_piece_moves(self, row, col, piece_type):
-        """Get possible moves for a piece type"""
-        moves = []
-        
-        if piece_type == 'pawn':
-            # Pawn direction based on color
-            direction = -1 if self.board[row][col][0] == 'white' else 1
-            start_rank = 6 if self.board[row][col][0] == 'white' else 1
-            
-            # Forward moves
-            if 0 <= row + direction < 8 and not self.board[row + direction][col]:
-                moves.append((row + direction, col))
-                if row == start_rank and not self.board[row + 2 * direction][col]:
-                    moves.append((row + 2 * direction, col))
-            
-            # Captures
-            for dc in [-1, 1]:
-                if 0 <= col + dc < 8 and 0 <= row + direction < 8:
-                    target = self.board[row + direction][col + dc]
-                    if target and target[0] != self.board[row][col][0]:
-                        moves.append((row + direction, col + dc))
-        
-        elif piece_type == 'knight':
-            knight_moves = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
-            for dr, dc in knight_moves:
-                new_row, new_col = row + dr, col + dc
-                if 0 <= new_row < 8 and 0 <= new_col < 8:
-                    moves.append((new_row, new_col))
-        
-        elif piece_type == 'king':
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    if dr == 0 and dc == 0:
-                        continue
-                    new_row, new_col = row + dr, col + dc
-                    if 0 <= new_row < 8 and 0 <= new_col < 8:
-                        moves.append((new_row, new_col))
-        
-        else:
-            # Sliding pieces
-            directions = []
-            if piece_type in ['rook', 'queen']:
-                directions.extend([(0, 1), (0, -1), (1, 0), (-1, 0)])
-            if piece_type in ['bishop', 'queen']:
-                directions.extend([(1, 1), (1, -1), (-1, 1), (-1, -1)])
-            
-            for dr, dc in directions:
-                for i in range(1, 8):
-                    new_row, new_col = row + dr * i, col + dc * i
-                    if 0 <= new_row < 8 and 0 <= new_col < 8:
-                        moves.append((new_row, new_col))
-                        if self.board[new_row][new_col]:  # Stop at piece
-                            break
-                    else:
-                        break
-        
-        return moves
-    
-    def score_move(self, start_row, start_col, end_row, end_col):
-        """Score a move for the computer"""
-        score = 1
-        target = self.board[end_row][end_col]
-        
-        if target:  # Capture
-            piece_values = {'pawn': 1, 'knight': 3, 'bishop': 3, 'rook': 5, 'queen': 9, 'king': 100}
-            score += piece_values.get(target[1], 1) * 10
-        
-        # Center control bonus
-        center_distance = max(abs(3.5 - end_row), abs(3.5 - end_col))
-        score += (4 - center_distance) * 0.5
-        
-        return score
-    
-    def is_valid_move(self, start_row, start_col, end_row, end_col):
-        # Basic bounds check
-        if not (0 <= end_row < 8 and 0 <= end_col < 8):
-            return False
-            
-        piece = self.board[start_row][start_col]
-        if not piece:
-            return False
-            
-        color, piece_type = piece
-        target = self.board[end_row][end_col]
-        
-        # Can't capture own piece
-        if target and target[0] == color:
-            return False
-        
-        # Basic piece movement rules
-        dr, dc = end_row - start_row, end_col - start_col
-        
-        if piece_type == 'pawn':
-            direction = -1 if color == 'white' else 1
-            start_rank = 6 if color == 'white' else 1
-            
-            if dc == 0:  # Moving forward
-                if dr == direction and not target:
-                    return True
-                if start_row == start_rank and dr == 2 * direction and not target:
-                    return True
-            elif abs(dc) == 1 and dr == direction and target:  # Capturing
-                return True
-                
-        elif piece_type == 'rook':
-            if dr == 0 or dc == 0:
-                return self.is_path_clear(start_row, start_col, end_row, end_col)
-                
-        elif piece_type == 'bishop':
-            if abs(dr) == abs(dc):
-                return self.is_path_clear(start_row, start_col, end_row, end_col)
-                
-        elif piece_type == 'queen':
-            if dr == 0 or dc == 0 or abs(dr) == abs(dc):
-                return self.is_path_clear(start_row, start_col, end_row, end_col)
-                
-        elif piece_type == 'knight':
-            return (abs(dr) == 2 and abs(dc) == 1) or (abs(dr) == 1 and abs(dc) == 2)
-            
-        elif piece_type == 'king':
-            return abs(dr) <= 1 and abs(dc) <= 1
-            
-        return False
-    
-    def is_path_clear(self, start_row, start_col, end_row, end_col):
-        dr = 0 if end_row == start_row else (1 if end_row > start_row else -1)
-        dc = 0 if end_col == start_col else (1 if end_col > start_col else -1)
-        
-        r, c = start_row + dr, start_col + dc
-        while (r, c) != (end_row, end_col):
-            if self.board[r][c] is not None:
-                return False
-            r, c = r + dr, c + dc
-            
-        return True
-    
     def make_move(self, start_row, start_col, end_row, end_col):
-        piece = self.board[start_row][start_col]
-        captured = self.board[end_row][end_col]
-        
-        # Update king position
-        if piece and piece[1] == 'king':
-            if piece[0] == 'white':
-                self.white_king_pos = (end_row, end_col)
-            else:
-                self.black_king_pos = (end_row, end_col)
-        
-        # Make the move
-        self.board[end_row][end_col] = piece
-        self.board[start_row][start_col] = None
-        
-        # Record move
-        move_str = f"{self.current_player}: {chr(ord('a')+start_col)}{8-start_row} to {chr(ord('a')+end_col)}{8-end_row}"
-        if captured:
-            move_str += f" (captured {captured[1]})"
-        self.move_history.append(move_str)
+        self.push_move(start_row, start_col, end_row, end_col)
         
         # Update history display
         self.history_text.delete(1.0, tk.END)
@@ -455,23 +639,12 @@ class ChessGame:
         self.history_text.insert(tk.END, '\n'.join(recent_moves))
         
         # Check for checkmate/game end
-        if captured and captured[1] == 'king':
-            winner = "White" if self.current_player == 'white' else "Black"
-            self.status_label.config(text=f"🎉 {winner} WINS! King captured!", fg="green", font=("Arial", 16, "bold"))
-            self.game_over = True
-            return
-        
-        # Switch turns
-        self.current_player = 'black' if self.current_player == 'white' else 'white'
+        if self.winner:
+            self.status_label.config(text=f"🎉 {self.winner.title()} WINS! King captured!", fg="green", font=("Arial", 16, "bold"))
     
     def new_game(self):
-        self.board = self.create_initial_board()
-        self.current_player = 'white'
+        self.reset()
         self.selected_square = None
-        self.game_over = False
-        self.white_king_pos = (7, 4)
-        self.black_king_pos = (0, 4)
-        self.move_history = []
         self.computer_thinking = False
         
         # Reset to human vs computer mode
@@ -486,8 +659,367 @@ class ChessGame:
     def run(self):
         self.window.mainloop()
 
-# Create and run the game
-if __name__ == "__main__":
+def parse_engine_config(spec):
+    """Parse an engine spec like 'heuristic' or 'depth=3,movetime=0.5' into a config dict"""
+    config = {'name': spec, 'heuristic': False, 'depth': None, 'movetime': None}
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if part == 'heuristic':
+            config['heuristic'] = True
+            continue
+        key, _, value = part.partition('=')
+        if key == 'depth':
+            config['depth'] = int(value)
+        elif key == 'movetime':
+            config['movetime'] = float(value)
+        else:
+            raise ValueError(f"Unknown engine option: {part}")
+    if not config['heuristic'] and config['depth'] is None and config['movetime'] is None:
+        config['depth'] = 2
+    return config
+
+def choose_engine_move(engine, config):
+    """Pick a move for the side to move; returns (move, depth, nodes, seconds)"""
+    if config['heuristic']:
+        # The GUI computer player: one ply over every legal move, with no search tree to count
+        start = time.perf_counter()
+        move = engine.find_computer_move()
+        return move, 1, 0, time.perf_counter() - start
+    
+    result = engine.search(max_depth=config['depth'], movetime=config['movetime'])
+    return result['move'], result['depth'], result['nodes'], result['time']
+
+def play_selfplay_game(job):
+    """Play one headless game; runs in a worker process"""
+    game_index, white_config, black_config, seed, opening_plies, max_plies = job
+    random.seed(seed)
+    engine = ChessEngine()
+    configs = {'white': white_config, 'black': black_config}
+    stats = {color: {'moves': 0, 'depth': 0, 'nodes': 0, 'time': 0.0} for color in configs}
+    
+    plies = 0
+    while not engine.game_over and plies < max_plies:
+        color = engine.current_player
+        if plies < opening_plies:
+            # Random opening so games between deterministic searchers differ
+            moves = engine.get_legal_moves()
+            move = random.choice(moves) if moves else None
+        else:
+            move, depth, nodes, seconds = choose_engine_move(engine, configs[color])
+            stats[color]['moves'] += 1
+            stats[color]['depth'] += depth
+            stats[color]['nodes'] += nodes
+            stats[color]['time'] += seconds
+        
+        if move is None:
+            # No valid moves: the GUI stops the game without a winner
+            break
+        engine.push_move(*move)
+        plies += 1
+    
+    return {'game': game_index, 'winner': engine.winner, 'plies': plies, 'stats': stats}
+
+def elo_difference(wins, draws, losses):
+    """Elo difference implied by a match score, with a 95% confidence margin
+    
+    The difference is None for a clean sweep (score 0 or 1, which has no
+    finite Elo), and the margin is None whenever it cannot be estimated:
+    a sweep, identical results in every game, or a margin reaching 0 or 1.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return None, None
+    
+    score = (wins + 0.5 * draws) / games
+    if score in (0.0, 1.0):
+        return None, None
+    
+    def to_elo(p):
+        return 400 * math.log10(p / (1 - p))
+    
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+    if variance == 0 or score - margin <= 0 or score + margin >= 1:
+        return to_elo(score), None
+    return to_elo(score), (to_elo(score + margin) - to_elo(score - margin)) / 2
+
+def run_selfplay(config_a, config_b, games, workers=None, max_plies=200, opening_plies=4, seed=0):
+    """Play engine A against engine B over a process pool and summarise the match"""
+    # Pairs of games share an opening with colours swapped
+    jobs = []
+    for i in range(games):
+        if i % 2 == 0:
+            jobs.append((i, config_a, config_b, seed + i // 2, opening_plies, max_plies))
+        else:
+            jobs.append((i, config_b, config_a, seed + i // 2, opening_plies, max_plies))
+    
+    totals = {name: {'moves': 0, 'depth': 0, 'nodes': 0, 'time': 0.0} for name in ('a', 'b')}
+    wins = draws = losses = 0
+    total_plies = 0
+    start = time.perf_counter()
+    
+    with Pool(processes=workers or os.cpu_count()) as pool:
+        for result in pool.imap_unordered(play_selfplay_game, jobs):
+            a_color = 'white' if result['game'] % 2 == 0 else 'black'
+            b_color = 'black' if a_color == 'white' else 'white'
+            if result['winner'] is None:
+                draws += 1
+            elif result['winner'] == a_color:
+                wins += 1
+            else:
+                losses += 1
+            total_plies += result['plies']
+            for name, color in (('a', a_color), ('b', b_color)):
+                for key, value in result['stats'][color].items():
+                    totals[name][key] += value
+            print(f"Game {result['game'] + 1}/{games}: "
+                  f"{result['winner'] or 'draw'} after {result['plies']} plies "
+                  f"(A +{wins} ={draws} -{losses})")
+    
+    elo, margin = elo_difference(wins, draws, losses)
+    report = {
+        'games': games,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'elo': elo,
+        'elo_margin': margin,
+        'average_plies': total_plies / games if games else 0,
+        'wall_time': time.perf_counter() - start,
+        'engines': {}
+    }
+    for name, config in (('a', config_a), ('b', config_b)):
+        total = totals[name]
+        moves = total['moves'] or 1
+        report['engines'][name] = {
+            'config': config['name'],
+            'moves': total['moves'],
+            'average_depth': total['depth'] / moves,
+            # The heuristic player does not search, so it has no node rate
+            'nodes_per_second': (None if config['heuristic'] else
+                                 total['nodes'] / total['time'] if total['time'] else 0.0),
+            'time_per_move': total['time'] / moves
+        }
+    return report
+
+def print_selfplay_report(report):
+    print("\nSelf-play results")
+    print("=" * 40)
+    print(f"Games: {report['games']}  A wins: {report['wins']}  "
+          f"draws: {report['draws']}  B wins: {report['losses']}")
+    if report['elo'] is None:
+        print("Elo difference (A - B): unbounded (one engine scored every point)")
+    elif report['elo_margin'] is None:
+        print(f"Elo difference (A - B): {report['elo']:+.1f} ± undefined (too few games for a margin)")
+    else:
+        print(f"Elo difference (A - B): {report['elo']:+.1f} ± {report['elo_margin']:.1f}")
+    print(f"Average game length: {report['average_plies']:.1f} plies")
+    print(f"Wall time: {report['wall_time']:.1f}s")
+    for name in ('a', 'b'):
+        engine = report['engines'][name]
+        nodes = f"{engine['nodes_per_second']:.0f} nodes/s, " if engine['nodes_per_second'] is not None else ""
+        print(f"Engine {name.upper()} [{engine['config']}]: "
+              f"depth {engine['average_depth']:.2f}, {nodes}"
+              f"{engine['time_per_move'] * 1000:.1f} ms/move")
+
+class UCIEngine:
+    """UCI protocol loop over stdin/stdout driving ChessEngine.search"""
+    
+    PIECE_LETTERS = {'p': 'pawn', 'n': 'knight', 'b': 'bishop', 'r': 'rook', 'q': 'queen', 'k': 'king'}
+    MIN_MOVETIME = 0.005  # Seconds; shortest search budget handed to the engine
+    
+    def __init__(self, input_stream=None, output_stream=None):
+        self.input_stream = input_stream or sys.stdin
+        self.output_stream = output_stream or sys.stdout
+        self.engine = ChessEngine()
+        self.search_thread = None
+        self.stop_event = threading.Event()
+    
+    def send(self, line):
+        self.output_stream.write(line + '\n')
+        self.output_stream.flush()
+    
+    def run(self):
+        for line in self.input_stream:
+            if not self.handle_command(line.strip()):
+                break
+        self.stop_search()
+    
+    def handle_command(self, line):
+        """Handle one UCI command; returns False on quit"""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+        
+        if command == 'uci':
+            self.send("id name chess.py")
+            self.send("id author python-ai")
+            self.send("uciok")
+        elif command == 'isready':
+            self.send("readyok")
+        elif command == 'ucinewgame':
+            self.wait_for_search()
+            self.engine.reset()
+        elif command == 'position':
+            self.wait_for_search()
+            self.set_position(tokens[1:])
+        elif command == 'go':
+            self.wait_for_search()
+            self.start_search(tokens[1:])
+        elif command == 'stop':
+            self.stop_search()
+        elif command == 'quit':
+            return False
+        return True
+    
+    def set_position(self, tokens):
+        """Handle 'position startpos|fen <fen> [moves ...]'"""
+        self.engine.reset()
+        if 'moves' in tokens:
+            split = tokens.index('moves')
+            setup, moves = tokens[:split], tokens[split + 1:]
+        else:
+            setup, moves = tokens, []
+        
+        if setup and setup[0] == 'fen':
+            self.load_fen(setup[1:])
+        
+        for move in moves:
+            # Promotions and castling are outside the engine's rules, so
+            # moves are applied as plain from/to square moves
+            start_row, start_col = self.square_to_coords(move[0:2])
+            end_row, end_col = self.square_to_coords(move[2:4])
+            self.engine.push_move(start_row, start_col, end_row, end_col)
+    
+    def load_fen(self, fields):
+        board = [[None for _ in range(8)] for _ in range(8)]
+        for row, rank in enumerate(fields[0].split('/')):
+            col = 0
+            for char in rank:
+                if char.isdigit():
+                    col += int(char)
+                    continue
+                color = 'white' if char.isupper() else 'black'
+                piece_type = self.PIECE_LETTERS[char.lower()]
+                board[row][col] = (color, piece_type)
+                if piece_type == 'king':
+                    setattr(self.engine, f"{color}_king_pos", (row, col))
+                col += 1
+        self.engine.board = board
+        self.engine.current_player = 'black' if len(fields) > 1 and fields[1] == 'b' else 'white'
+    
+    def start_search(self, tokens):
+        """Handle 'go' with depth, movetime, wtime/btime/winc/binc/movestogo or infinite"""
+        options = {}
+        for i, token in enumerate(tokens[:-1]):
+            if token in ('depth', 'movetime', 'wtime', 'btime', 'winc', 'binc', 'movestogo'):
+                try:
+                    options[token] = int(tokens[i + 1])
+                except ValueError:
+                    pass  # Ignore a malformed value rather than ending the UCI loop
+        
+        max_depth = options.get('depth')
+        movetime = options['movetime'] / 1000 if 'movetime' in options else None
+        side = 'w' if self.engine.current_player == 'white' else 'b'
+        if movetime is None and f"{side}time" in options:
+            remaining = options[f"{side}time"] / 1000
+            increment = options.get(f"{side}inc", 0) / 1000
+            moves_to_go = max(options.get('movestogo', 30), 1)
+            movetime = min(remaining / moves_to_go + increment / 2, remaining / 2)
+        if movetime is not None:
+            # Even a 0 ms budget gets a few ms so at least the first iteration can finish
+            movetime = max(movetime, self.MIN_MOVETIME)
+        if max_depth is None and movetime is None and 'infinite' not in tokens:
+            max_depth = 3
+        
+        self.stop_event.clear()
+        self.search_thread = threading.Thread(target=self.search_and_report,
+                                              args=(max_depth, movetime, 'infinite' in tokens), daemon=True)
+        self.search_thread.start()
+    
+    def search_and_report(self, max_depth, movetime, infinite=False):
+        result = self.engine.search(max_depth=max_depth, movetime=movetime,
+                                    stop_event=self.stop_event, info_callback=self.send_info)
+        if infinite:
+            # UCI: an infinite search reports bestmove only after 'stop', even if it ended early (e.g. on a mate)
+            self.stop_event.wait()
+        if result['move']:
+            self.send(f"bestmove {self.move_to_uci(result['move'])}")
+        else:
+            self.send("bestmove 0000")
+    
+    def send_info(self, info):
+        if abs(info['score']) >= ChessEngine.MATE_SCORE:
+            # MATE_SCORE + remaining depth at the king capture gives the ply it happens on
+            ply = info['depth'] - (abs(info['score']) - ChessEngine.MATE_SCORE) + 1
+            moves = (ply + 1) // 2
+            score = f"mate {moves if info['score'] > 0 else -moves}"
+        else:
+            # Evaluation units are tenths of a pawn
+            score = f"cp {int(info['score'] * 10)}"
+        millis = int(info['time'] * 1000)
+        nps = int(info['nodes'] / info['time']) if info['time'] else 0
+        self.send(f"info depth {info['depth']} score {score} nodes {info['nodes']} "
+                  f"time {millis} nps {nps} pv {self.move_to_uci(info['move'])}")
+    
+    def wait_for_search(self):
+        # Commands that touch the board wait for a running search to finish
+        if self.search_thread:
+            self.search_thread.join()
+        self.search_thread = None
+    
+    def stop_search(self):
+        self.stop_event.set()
+        self.wait_for_search()
+    
+    @staticmethod
+    def square_to_coords(square):
+        return 8 - int(square[1]), ord(square[0]) - ord('a')
+    
+    @staticmethod
+    def move_to_uci(move):
+        start_row, start_col, end_row, end_col = move
+        return f"{chr(ord('a')+start_col)}{8-start_row}{chr(ord('a')+end_col)}{8-end_row}"
+
+def main():
+    parser = argparse.ArgumentParser(description='Chess game with headless UCI and self-play modes')
+    parser.add_argument('--uci', action='store_true', help='Speak the UCI protocol on stdin/stdout instead of opening the board')
+    parser.add_argument('--selfplay', type=int, metavar='GAMES', help='Play GAMES headless engine-vs-engine games and exit')
+    parser.add_argument('--engine-a', default='depth=2', help="Engine A spec: 'heuristic' or 'depth=N,movetime=SECONDS'")
+    parser.add_argument('--engine-b', default='heuristic', help='Engine B spec, same format as --engine-a')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--max-plies', type=int, default=200, help='Adjudicate a draw after this many plies')
+    parser.add_argument('--opening-plies', type=int, default=4, help='Random plies played before the engines take over')
+    parser.add_argument('--seed', type=int, default=0, help='Base random seed')
+    parser.add_argument('--json', help='Also write the self-play report to this JSON file')
+    
+    args = parser.parse_args()
+    if args.selfplay is not None and args.selfplay < 1:
+        parser.error("--selfplay needs at least 1 game")
+    
+    if args.uci:
+        UCIEngine().run()
+        return
+    
+    if args.selfplay is not None:
+        report = run_selfplay(parse_engine_config(args.engine_a), parse_engine_config(args.engine_b),
+                              args.selfplay, args.workers, args.max_plies, args.opening_plies, args.seed)
+        print_selfplay_report(report)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+        return
+    
+    if tk is None:
+        print("Tkinter is not available; use --uci or --selfplay for headless play")
+        sys.exit(1)
+    
+    # Create and run the game
     game = ChessGame()
     game.run()
 
+if __name__ == "__main__":
+    main()
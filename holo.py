@@ -6,21 +6,179 @@ Converts a JPG image into a holographic-style image and saves it as a new JPG fi
 
 import os
 import sys
-import tkinter as tk
-from tkinter import filedialog, messagebox
+import argparse
+import glob
+from multiprocessing import Pool
+try:
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+except ImportError:
+    # Tk only backs the file picker used when no input path is given
+    tk = None
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
 import random
 import math
+try:
+    import cv2
+except ImportError:
+    # Only the animated video mode needs OpenCV
+    cv2 = None
+import time
+from functools import lru_cache
+
+def build_distortion_map(width, height, phase_step=0, phase_steps=1):
+    """Flat source pixel index for every output pixel of the wave distortion
+    
+    phase_step/phase_steps shifts both waves along y by that fraction of a
+    cycle for animation; step 0 is the still-image distortion.
+    """
+    phase = 2 * math.pi * phase_step / phase_steps
+    
+    # Sines come from math.sin per row/column so truncation matches the old loop exactly
+    xs = np.arange(width, dtype=np.float64)
+    ys = np.arange(height, dtype=np.float64)
+    sin_y_x = 3 * np.array([math.sin(y * 0.1 + phase) for y in range(height)])
+    sin_x_x = np.array([math.sin(x * 0.05) for x in range(width)])
+    cos_x_y = 2 * np.array([math.cos(x * 0.08) for x in range(width)])
+    sin_y_y = np.array([math.sin(y * 0.03 + phase) for y in range(height)])
+    
+    wave_x = np.trunc(xs[np.newaxis, :] + sin_y_x[:, np.newaxis] * sin_x_x[np.newaxis, :])
+    wave_y = np.trunc(ys[:, np.newaxis] + cos_x_y[np.newaxis, :] * sin_y_y[:, np.newaxis])
+    
+    # Clamp coordinates; int32 halves the map size when every flat index fits in it
+    index_type = np.int32 if width * height <= np.iinfo(np.int32).max else np.intp
+    wave_x = np.clip(wave_x, 0, width - 1).astype(index_type)
+    wave_y = np.clip(wave_y, 0, height - 1).astype(index_type)
+    
+    source_index = (wave_y * width + wave_x).ravel()
+    source_index.flags.writeable = False
+    return source_index
+
+@lru_cache(maxsize=8)
+def distortion_map(width, height):
+    """Still-image distortion map, cached per size for batch runs"""
+    return build_distortion_map(width, height)
+
+# Noise dot colors and their alpha ranges (inclusive low, exclusive high)
+NOISE_COLORS = np.array([(0, 255, 255), (100, 255, 255), (255, 255, 255)], dtype=np.uint8)
+NOISE_ALPHA_LOW = np.array([50, 30, 20])
+NOISE_ALPHA_HIGH = np.array([151, 101, 81])
+
+def holographic_overlay(width, height, rng):
+    """RGBA overlay array with scanlines, interference lines and noise dots drawn from a numpy Generator"""
+    overlay = np.zeros((height, width, 4), dtype=np.uint8)
+    
+    # Add scan lines: every 4th row cyan, the row below it a dimmer blue
+    scan_alpha = rng.integers(20, 61, size=len(range(0, height, 4))).astype(np.uint8)
+    overlay[0::4, :, :3] = (0, 255, 255)
+    overlay[0::4, :, 3] = scan_alpha[:, np.newaxis]
+    second = overlay[1::4]
+    second[:, :, :3] = (0, 150, 255)
+    second[:, :, 3] = (scan_alpha[:len(second)] // 2)[:, np.newaxis]
+    
+    # Add vertical interference lines
+    columns = overlay[:, 0::int(rng.integers(15, 41))]
+    columns[:, :, :3] = (100, 200, 255)
+    columns[:, :, 3] = rng.integers(10, 31, size=columns.shape[1]).astype(np.uint8)[np.newaxis, :]
+    
+    # Add random noise dots for digital artifact effect
+    count = width * height // 100
+    ys = rng.integers(0, height, size=count)
+    xs = rng.integers(0, width, size=count)
+    kinds = rng.integers(0, len(NOISE_COLORS), size=count)
+    overlay[ys, xs, :3] = NOISE_COLORS[kinds]
+    overlay[ys, xs, 3] = rng.integers(NOISE_ALPHA_LOW[kinds], NOISE_ALPHA_HIGH[kinds])
+    
+    return overlay
+
+def holographic_overlay_reference(width, height):
+    """Original draw-call overlay, kept for benchmarking against holographic_overlay"""
+    # Create overlay for holographic effects
+    overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    
+    # Add scan lines
+    for y in range(0, height, 4):
+        alpha = random.randint(20, 60)
+        draw.line([(0, y), (width, y)], fill=(0, 255, 255, alpha), width=1)
+        if y + 1 < height:
+            draw.line([(0, y + 1), (width, y + 1)], fill=(0, 150, 255, alpha//2), width=1)
+    
+    # Add vertical interference lines
+    for x in range(0, width, random.randint(15, 40)):
+        alpha = random.randint(10, 30)
+        draw.line([(x, 0), (x, height)], fill=(100, 200, 255, alpha), width=1)
+    
+    # Add random noise dots for digital artifact effect
+    for _ in range(width * height // 100):
+        x = random.randint(0, width - 1)
+        y = random.randint(0, height - 1)
+        color = random.choice([
+            (0, 255, 255, random.randint(50, 150)),
+            (100, 255, 255, random.randint(30, 100)),
+            (255, 255, 255, random.randint(20, 80))
+        ])
+        draw.point((x, y), fill=color)
+    
+    return overlay
+
+def overlay_statistics(overlay):
+    """Summary numbers used to check two overlay generators look alike"""
+    overlay = np.asarray(overlay)
+    alpha = overlay[:, :, 3]
+    return {
+        'covered': float(np.count_nonzero(alpha)) / alpha.size,
+        'mean_alpha': float(alpha.mean()),
+        'mean_rgb': [round(float(c), 1) for c in overlay[:, :, :3][alpha > 0].mean(axis=0)]
+    }
+
+def benchmark_holographic_overlay(repeats=3):
+    """Time the reference and array overlays at common sizes and print their statistics"""
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    for width, height in ((640, 480), (1920, 1080)):
+        timings = {}
+        stats = {}
+        for name, func in (("reference", lambda: holographic_overlay_reference(width, height)),
+                           ("array", lambda: holographic_overlay(width, height, rng))):
+            best = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                overlay = func()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+            stats[name] = overlay_statistics(overlay)
+        print(f"{width}x{height}: reference {timings['reference'] * 1000:.1f} ms, "
+              f"array {timings['array'] * 1000:.1f} ms ({timings['reference'] / timings['array']:.1f}x)")
+        for name in ("reference", "array"):
+            print(f"  {name:9s} covered {stats[name]['covered']:.3f}, mean alpha {stats[name]['mean_alpha']:.2f}, "
+                  f"mean color {stats[name]['mean_rgb']}")
 
 class HologramGenerator:
-    def __init__(self):
-        # Initialize tkinter for file dialog
-        self.root = tk.Tk()
-        self.root.withdraw()  # Hide the main window
+    def __init__(self, seed=None, reuse_overlay=False, verbose=True):
+        # Tk root for the file dialog, created on first use so batch workers never open one
+        self.root = None
+        
+        # Random source for overlay scanlines and noise; fixed seeds give repeatable output
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        
+        # Optionally keep one overlay per image size instead of drawing a fresh one per image
+        self.reuse_overlay = reuse_overlay
+        self.overlay_cache = {}
+        self.verbose = verbose
         
     def select_image_file(self):
         """Open file dialog to select an image file"""
+        if tk is None:
+            print("tkinter is not available; enter the filename manually instead.")
+            return None
+        if self.root is None:
+            self.root = tk.Tk()
+            self.root.withdraw()  # Hide the main window
+        
         file_types = [
             ("Image files", "*.jpg *.jpeg *.png *.bmp *.tiff *.gif"),
             ("JPEG files", "*.jpg *.jpeg"),
@@ -35,61 +193,29 @@ class HologramGenerator:
         
         return filename if filename else None
     
-    def add_holographic_overlay(self, image):
+    def add_holographic_overlay(self, image, rng=None):
         """Add holographic visual effects to the image"""
         width, height = image.size
-        
-        # Create overlay for holographic effects
-        overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-        
-        # Add scan lines
-        for y in range(0, height, 4):
-            alpha = random.randint(20, 60)
-            draw.line([(0, y), (width, y)], fill=(0, 255, 255, alpha), width=1)
-            if y + 1 < height:
-                draw.line([(0, y + 1), (width, y + 1)], fill=(0, 150, 255, alpha//2), width=1)
-        
-        # Add vertical interference lines
-        for x in range(0, width, random.randint(15, 40)):
-            alpha = random.randint(10, 30)
-            draw.line([(x, 0), (x, height)], fill=(100, 200, 255, alpha), width=1)
-        
-        # Add random noise dots for digital artifact effect
-        for _ in range(width * height // 100):
-            x = random.randint(0, width - 1)
-            y = random.randint(0, height - 1)
-            color = random.choice([
-                (0, 255, 255, random.randint(50, 150)),
-                (100, 255, 255, random.randint(30, 100)),
-                (255, 255, 255, random.randint(20, 80))
-            ])
-            draw.point((x, y), fill=color)
-        
+        if not self.reuse_overlay:
+            return Image.fromarray(holographic_overlay(width, height, self.rng if rng is None else rng), 'RGBA')
+        
+        overlay = self.overlay_cache.get((width, height))
+        if overlay is None:
+            # Seed cached overlays by size so every batch worker builds the same one
+            size_rng = np.random.default_rng([self.seed, width, height]) if self.seed is not None else self.rng
+            overlay = Image.fromarray(holographic_overlay(width, height, size_rng), 'RGBA')
+            self.overlay_cache[(width, height)] = overlay
         return overlay
     
     def add_holographic_distortion(self, image):
         """Add wave distortion effect to simulate holographic instability"""
         width, height = image.size
+        source_index = distortion_map(width, height)
         
-        # Create distortion map
-        distorted = Image.new('RGB', (width, height))
-        pixels = image.load()
-        distorted_pixels = distorted.load()
-        
-        for y in range(height):
-            for x in range(width):
-                # Create wave distortion
-                wave_x = int(x + 3 * math.sin(y * 0.1) * math.sin(x * 0.05))
-                wave_y = int(y + 2 * math.cos(x * 0.08) * math.sin(y * 0.03))
-                
-                # Clamp coordinates
-                wave_x = max(0, min(width - 1, wave_x))
-                wave_y = max(0, min(height - 1, wave_y))
-                
-                distorted_pixels[x, y] = pixels[wave_x, wave_y]
-        
-        return distorted
+        # One gather through the cached map instead of a per-pixel loop
+        pixels = np.asarray(image.convert('RGB')).reshape(-1, 3)
+        distorted = pixels[source_index]
+        return Image.fromarray(distorted.reshape(height, width, 3))
     
     def apply_holographic_color_grading(self, image):
         """Apply cyan/blue color grading for holographic look"""
@@ -127,18 +253,117 @@ class HologramGenerator:
         # Blend original image with glow
         return Image.blend(image, glow, alpha=0.3)
     
-    def create_hologram_effect(self, input_image):
-        """Apply all holographic effects to the image"""
-        print("Applying holographic effects...")
-        
+    def fit_input_image(self, input_image, max_size=1920):
+        """Shrink the image to fit max_size and convert it to RGB"""
         # Resize if image is too large
-        max_size = 1920
         if input_image.width > max_size or input_image.height > max_size:
             input_image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
         
         # Convert to RGB if not already
         if input_image.mode != 'RGB':
             input_image = input_image.convert('RGB')
+        return input_image
+    
+    def create_animation_base(self, input_image):
+        """Phase-independent part of the effect for one source frame, as a BGR array
+        
+        Grading, blur, glow, contrast and brightness are applied before the
+        distortion here, so each animated frame only needs the phase's map.
+        """
+        hologram = self.apply_holographic_color_grading(self.fit_input_image(input_image))
+        hologram = hologram.filter(ImageFilter.GaussianBlur(radius=0.5))
+        hologram = self.add_glow_effect(hologram)
+        hologram = ImageEnhance.Contrast(hologram).enhance(1.3)
+        hologram = ImageEnhance.Brightness(hologram).enhance(1.1)
+        return np.ascontiguousarray(np.asarray(hologram)[:, :, ::-1])
+    
+    def render_animation(self, input_path, output_path, fps=24, frames=96, cycle_frames=48, drift=1):
+        """Render an animated hologram of an image or video straight into a video file
+        
+        Distortion phase advances one step per frame over cycle_frames and the
+        scanline overlay drifts down drift pixels per frame. A video input
+        contributes one source frame per output frame; a still image is
+        animated for the given number of frames.
+        """
+        if cv2 is None:
+            print("Error: animated mode needs OpenCV (pip install opencv-python)")
+            return False
+        
+        capture = None
+        if os.path.splitext(input_path)[1].lower() in VIDEO_EXTENSIONS:
+            capture = cv2.VideoCapture(input_path)
+            if not capture.isOpened():
+                print(f"Error: could not open video '{input_path}'")
+                return False
+            fps = capture.get(cv2.CAP_PROP_FPS) or fps
+            base = None
+        else:
+            try:
+                with Image.open(input_path) as input_image:
+                    base = self.create_animation_base(input_image)
+            except FileNotFoundError:
+                print(f"Error: File '{input_path}' not found.")
+                return False
+        
+        writer = None
+        written = 0
+        phase_maps = None
+        maps_built = 0
+        start = time.perf_counter()
+        try:
+            while capture is not None or written < frames:
+                if capture is not None:
+                    ok, source = capture.read()
+                    if not ok:
+                        break
+                    base = self.create_animation_base(Image.fromarray(cv2.cvtColor(source, cv2.COLOR_BGR2RGB)))
+                
+                height, width = base.shape[:2]
+                if writer is None:
+                    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+                    premultiplied, inverse_alpha = self.animation_overlay(width, height)
+                    
+                    # One map per phase, built on first use and reused on every later cycle
+                    phase_maps = [None] * cycle_frames
+                
+                # Per frame: one gather through the phase's cached map and one overlay blend
+                phase_step = written % cycle_frames
+                if phase_maps[phase_step] is None:
+                    phase_maps[phase_step] = build_distortion_map(width, height, phase_step, cycle_frames)
+                    maps_built += 1
+                source_index = phase_maps[phase_step]
+                frame = base.reshape(-1, 3)[source_index].reshape(height, width, 3)
+                shift = (written * drift) % height
+                writer.write(blend_animation_overlay(frame, np.roll(premultiplied, shift, axis=0),
+                                                     np.roll(inverse_alpha, shift, axis=0)))
+                written += 1
+        finally:
+            if capture is not None:
+                capture.release()
+            if writer is not None:
+                writer.release()
+        
+        if written == 0:
+            print(f"Error: no frames read from '{input_path}'")
+            return False
+        elapsed = time.perf_counter() - start
+        # maps_built stays at cycle_frames however many cycles are rendered
+        print(f"✓ Wrote {written} frames to {output_path} ({written / elapsed:.1f} frames/s, "
+              f"{maps_built} distortion maps for {cycle_frames} phases)")
+        return True
+    
+    def animation_overlay(self, width, height):
+        """Overlay for animated frames as BGR premultiplied color and inverse alpha (uint16)"""
+        overlay = np.asarray(self.add_holographic_overlay(Image.new('RGB', (width, height))))
+        alpha = overlay[:, :, 3:4].astype(np.uint16)
+        return overlay[:, :, 2::-1] * alpha, 255 - alpha
+    
+    def create_hologram_effect(self, input_image, rng=None):
+        """Apply all holographic effects to the image"""
+        if self.verbose:
+            print("Applying holographic effects...")
+        
+        input_image = self.fit_input_image(input_image)
         
         # Step 1: Apply color grading
         hologram = self.apply_holographic_color_grading(input_image)
@@ -161,7 +386,7 @@ class HologramGenerator:
         hologram = enhancer.enhance(1.1)
         
         # Step 7: Create and apply overlay effects
-        overlay = self.add_holographic_overlay(hologram)
+        overlay = self.add_holographic_overlay(hologram, rng)
         
         # Composite the overlay onto the image
         hologram = Image.alpha_composite(
@@ -268,30 +493,191 @@ class HologramGenerator:
                         
             print("\n" + "-" * 60 + "\n")
     
-    def run_batch(self, input_files):
-        """Batch processing mode"""
-        print(f"Processing {len(input_files)} files...")
+    def run_batch(self, input_files, output_dir=None, workers=None, quiet=False, input_root=None):
+        """Batch processing mode; input_files may be any iterable, including a lazy stdin reader
+        
+        Inputs under input_root keep their subdirectories in the output; an input
+        whose output path is already taken by an earlier input fails instead of
+        overwriting it.
+        """
+        workers = workers or os.cpu_count() or 1
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        if not quiet:
+            print(f"Processing files with {workers} worker(s)...")
+        
+        collisions = []
+        
+        def make_tasks():
+            claimed = {}
+            for index, input_file in enumerate(input_files):
+                output_path = hologram_output_path(input_file, output_dir, input_root)
+                key = os.path.normcase(os.path.abspath(output_path))
+                if key in claimed:
+                    # Runs on the pool's task thread for parallel batches, so only append here
+                    collisions.append((index, input_file, f"output {output_path} is already used by {claimed[key]}"))
+                    continue
+                claimed[key] = input_file
+                yield index, input_file, output_path
         
+        tasks = make_tasks()
         successful = 0
-        for i, input_file in enumerate(input_files, 1):
-            print(f"\n[{i}/{len(input_files)}] Processing: {input_file}")
-            success, output_path = self.generate_hologram_image(input_file)
-            if success:
-                successful += 1
+        failed = 0
+        if workers == 1:
+            init_hologram_worker(self.seed, self.reuse_overlay)
+            results = map(hologram_task, tasks)
+            pool = None
+        else:
+            # Workers load, render and save their own images and return only paths, so memory
+            # in flight stays at one image per worker however long the input list is
+            pool = Pool(workers, initializer=init_hologram_worker, initargs=(self.seed, self.reuse_overlay))
+            results = pool.imap_unordered(hologram_task, tasks)
         
-        print(f"\nBatch processing complete!")
-        print(f"Successfully processed: {successful}/{len(input_files)} files")
+        try:
+            for index, input_file, output_path, error in results:
+                if error is None:
+                    successful += 1
+                    if quiet:
+                        print(output_path, flush=True)
+                    else:
+                        print(f"[{index + 1}] ✓ {input_file} -> {output_path}", flush=True)
+                else:
+                    failed += 1
+                    print(f"[{index + 1}] ✗ {input_file}: {error}", file=sys.stderr, flush=True)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        
+        for index, input_file, error in collisions:
+            failed += 1
+            print(f"[{index + 1}] ✗ {input_file}: {error}", file=sys.stderr, flush=True)
+        
+        if not quiet:
+            print(f"\nBatch processing complete!")
+            print(f"Successfully processed: {successful}/{successful + failed} files")
+        return successful, failed
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v'}
+
+def blend_animation_overlay(frame, premultiplied, inverse_alpha):
+    """frame * (255 - alpha) + color * alpha, divided by 255 in 16-bit fixed point"""
+    blended = frame * inverse_alpha + premultiplied
+    blended += 128
+    blended += blended >> 8
+    blended >>= 8
+    return blended.astype(np.uint8)
+
+def hologram_output_path(input_path, output_dir=None, input_root=None):
+    """Default output path for an input image: <name>_hologram.jpg, optionally inside output_dir
+    
+    Inputs under input_root keep their path relative to it, so a/p0.jpg and
+    b/p0.jpg from one glob do not map to the same output.
+    """
+    name = os.path.basename(input_path)
+    if input_root is not None:
+        relative = os.path.relpath(input_path, input_root)
+        if not relative.startswith(os.pardir):
+            name = relative
+    base_name = os.path.splitext(name)[0]
+    return os.path.join(output_dir or '', f"{base_name}_hologram.jpg")
+
+def glob_root(pattern):
+    """Directory part of a glob pattern before its first wildcard"""
+    parts = []
+    for part in os.path.dirname(pattern).split(os.sep):
+        if any(char in part for char in '*?['):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or '.'
+
+def iter_input_paths(paths=(), read_stdin=False, pattern=None):
+    """Yield input paths from arguments, a recursive glob and/or stdin (one path per line)"""
+    for path in paths:
+        yield path
+    if pattern:
+        yield from sorted(glob.glob(pattern, recursive=True))
+    if read_stdin:
+        for line in sys.stdin:
+            path = line.strip()
+            if path:
+                yield path
+
+# Per-process generator for batch workers
+WORKER_STATE = {}
+
+def init_hologram_worker(seed, reuse_overlay):
+    """Create the quiet generator a batch worker reuses; its distortion maps and overlays stay cached"""
+    WORKER_STATE['generator'] = HologramGenerator(seed=seed, reuse_overlay=reuse_overlay, verbose=False)
+
+def hologram_task(task):
+    """Render and save one image; returns (index, input, output, error)"""
+    index, input_path, output_path = task
+    generator = WORKER_STATE['generator']
+    
+    # Seed each image by its position so results do not depend on which worker ran it
+    rng = np.random.default_rng([generator.seed, index]) if generator.seed is not None else None
+    try:
+        with Image.open(input_path) as input_image:
+            hologram = generator.create_hologram_effect(input_image, rng)
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        hologram.save(output_path, 'JPEG', quality=95)
+        return index, input_path, output_path, None
+    except FileNotFoundError:
+        return index, input_path, None, "file not found"
+    except Exception as e:
+        return index, input_path, None, str(e)
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description='Convert images into holographic-style JPGs')
+    parser.add_argument('images', nargs='*', help='Input images; "-" reads paths from stdin')
+    parser.add_argument('--glob', dest='pattern', help='Also process files matching this pattern (** is recursive)')
+    parser.add_argument('--stdin', action='store_true', help='Read input paths from stdin, one per line')
+    parser.add_argument('-o', '--output-dir', help='Directory for the _hologram.jpg outputs (--glob inputs keep their subdirectories)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Worker processes for batch mode (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for repeatable overlays')
+    parser.add_argument('--reuse-overlay', action='store_true', help='Use one overlay per image size for the whole batch')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Print only output paths, for shell pipelines')
+    parser.add_argument('--animate', metavar='VIDEO', help='Render the single input image or video as an animated hologram into VIDEO (.mp4)')
+    parser.add_argument('--fps', type=int, default=24, help='Frame rate for animating a still image')
+    parser.add_argument('--frames', type=int, default=96, help='Number of frames when animating a still image')
+    parser.add_argument('--cycle', type=int, default=48,
+                        help='Frames per distortion wave cycle; one index map per frame of the cycle stays in '
+                             'memory, width*height*4 bytes each (about 400 MB for 48 at 1080p)')
+    parser.add_argument('--drift', type=int, default=1, help='Scanline drift in pixels per frame')
+    parser.add_argument('--benchmark-overlay', action='store_true', help='Compare the reference and array overlays and exit')
+    args = parser.parse_args()
+    for name in ('fps', 'frames', 'cycle'):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name} must be at least 1")
+    
     try:
-        generator = HologramGenerator()
+        if args.benchmark_overlay:
+            benchmark_holographic_overlay()
+            return
+        
+        generator = HologramGenerator(seed=args.seed, reuse_overlay=args.reuse_overlay)
+        
+        if args.animate:
+            if len(args.images) != 1:
+                print("Animated mode takes exactly one input image or video")
+                return
+            generator.render_animation(args.images[0], args.animate, args.fps, args.frames, args.cycle, args.drift)
+            return
         
         # Check command line arguments for batch processing
-        if len(sys.argv) > 1:
+        read_stdin = args.stdin or '-' in args.images
+        if args.images or args.pattern or read_stdin:
             # Batch mode
-            input_files = sys.argv[1:]
-            generator.run_batch(input_files)
+            paths = [path for path in args.images if path != '-']
+            input_files = iter_input_paths(paths, read_stdin, args.pattern)
+            input_root = glob_root(args.pattern) if args.pattern else None
+            successful, failed = generator.run_batch(input_files, args.output_dir, args.workers,
+                                                     args.quiet, input_root)
+            if failed:
+                sys.exit(1)
         else:
             # Interactive mode
             generator.run_interactive()
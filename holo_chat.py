@@ -7,8 +7,11 @@ import threading
 import requests
 from PIL import Image, ImageTk, ImageDraw
 import io
+from collections import OrderedDict
 import math
 import random
+import hashlib
+import tempfile
 
 # Optional voice imports - will gracefully handle if missing
 VOICE_AVAILABLE = False
@@ -20,6 +23,167 @@ except ImportError:
     VOICE_AVAILABLE = False
     print("Voice libraries not available. Install with: pip install speechrecognition pyttsx3 pyaudio")
 
+def default_file_mode():
+    """Permissions open() gives a new file under the current umask"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+# mkstemp creates 0600 files; written files get the usual mode instead
+DEFAULT_FILE_MODE = default_file_mode()
+
+def write_atomic(path, data):
+    """Write bytes to path via a temporary file and rename, so readers never see a partial file"""
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, DEFAULT_FILE_MODE)
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+
+class HologramLibrary:
+    """Saved holograms: a small JSON index plus image bytes stored once each under their sha256"""
+    
+    def __init__(self, root='hologram_library', legacy_path='holograms.json'):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.legacy_path = legacy_path
+    
+    def blob_path(self, digest):
+        """Where the image with this sha256 lives"""
+        return os.path.join(self.blob_dir, digest[:2], digest)
+    
+    def store_image(self, data):
+        """Store image bytes unless an identical image is already stored; returns the sha256"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_atomic(path, data)
+        return digest
+    
+    def read_image(self, digest):
+        """Bytes of a stored image"""
+        with open(self.blob_path(digest), 'rb') as f:
+            return f.read()
+    
+    def load(self):
+        """Hologram entries from the index, importing the old base64 holograms.json the first time"""
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                return json.load(f)['holograms']
+        if os.path.exists(self.legacy_path):
+            return self.import_legacy()
+        return []
+    
+    def save(self, holograms):
+        """Rewrite the index; callers store each hologram's images first"""
+        os.makedirs(self.root, exist_ok=True)
+        write_atomic(self.index_path, json.dumps({'version': 1, 'holograms': holograms}, indent=1).encode('utf-8'))
+    
+    def import_legacy(self):
+        """Move images out of holograms.json into the blob store; the old file is left in place"""
+        with open(self.legacy_path, 'r') as f:
+            holograms = json.load(f)
+        for hologram in holograms:
+            for image_info in hologram.get('images', []):
+                if 'data' in image_info:
+                    image_info['sha256'] = self.store_image(base64.b64decode(image_info.pop('data')))
+        self.save(holograms)
+        return holograms
+
+# Rendition sizes: the hologram screen shows the full composite, the chat pane a smaller copy
+DISPLAY_SIZE = 320
+CHAT_SIZE = 280
+
+# Bump when the rendition look changes so old files on disk are ignored
+RENDITION_VERSION = 1
+
+def render_hologram_rendition(image_data, size=DISPLAY_SIZE):
+    """Circular hologram composite (image plus glow ring) of encoded image bytes, at size x size"""
+    # Create a circular hologram for the image
+    composite_size = 300
+    composite = Image.new('RGBA', (composite_size, composite_size), (0, 0, 0, 0))
+    
+    # Create circular mask
+    mask = Image.new('L', (composite_size, composite_size), 0)
+    mask_draw = ImageDraw.Draw(mask)
+    mask_draw.ellipse((0, 0, composite_size, composite_size), fill=255)
+    
+    # Load and resize image
+    image = Image.open(io.BytesIO(image_data))
+    image = image.convert('RGBA')
+    image = image.resize((composite_size, composite_size), Image.Resampling.LANCZOS)
+    
+    # Apply mask
+    composite.paste(image, (0, 0))
+    composite.putalpha(mask)
+    
+    # Add holographic effect (subtle glow)
+    glow = Image.new('RGBA', (composite_size + 20, composite_size + 20), (0, 0, 0, 0))
+    glow_draw = ImageDraw.Draw(glow)
+    
+    # Create multiple glow layers
+    for i in range(5):
+        alpha = 30 - (i * 5)
+        glow_draw.ellipse((i, i, composite_size + 20 - i, composite_size + 20 - i), 
+                        outline=(100, 200, 255, alpha), width=2)
+    
+    # Combine glow with composite
+    final_composite = Image.new('RGBA', (composite_size + 20, composite_size + 20), (0, 0, 0, 0))
+    final_composite.paste(glow, (0, 0))
+    final_composite.paste(composite, (10, 10), composite)
+    
+    if size != final_composite.width:
+        final_composite = final_composite.resize((size, size), Image.Resampling.LANCZOS)
+    return final_composite
+
+class RenditionCache:
+    """Display-size hologram renditions keyed by image content hash, in memory (LRU) and as PNGs on disk"""
+    
+    def __init__(self, cache_dir, max_items=64):
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.memory = OrderedDict()
+    
+    def path(self, digest, size):
+        """Disk location of one rendition"""
+        return os.path.join(self.cache_dir, f"{digest}_{size}_v{RENDITION_VERSION}.png")
+    
+    def get(self, digest, size, load_bytes):
+        """Rendition for the image with this sha256, rendering it from load_bytes() only if never cached"""
+        key = (digest, size)
+        image = self.memory.get(key)
+        if image is not None:
+            self.memory.move_to_end(key)
+            return image
+        
+        path = self.path(digest, size)
+        try:
+            with Image.open(path) as cached:
+                image = cached.convert('RGBA')
+        except (OSError, ValueError):
+            image = render_hologram_rendition(load_bytes(), size)
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                buffer = io.BytesIO()
+                image.save(buffer, 'PNG')
+                write_atomic(path, buffer.getvalue())
+            except OSError as e:
+                print(f"Could not cache rendition: {e}")
+        
+        self.memory[key] = image
+        while len(self.memory) > self.max_items:
+            self.memory.popitem(last=False)
+        return image
+
 class HologramCreator:
     def __init__(self):
         self.root = tk.Tk()
@@ -42,6 +206,9 @@ class HologramCreator:
             }
         }
         self.saved_holograms = []
+        self.library = HologramLibrary()
+        self.unsaved_images = {}  # sha256 -> bytes of selected images, stored in the library on save
+        self.renditions = RenditionCache(os.path.join(self.library.root, 'renditions'))
         self.chat_history = []
         self.communication_mode = 'voice'
         self.merged_hologram_image = None
@@ -49,6 +216,7 @@ class HologramCreator:
         # Image cycling variables
         self.current_image_index = 0
         self.cycle_images = []
+        self.chat_photos = []  # PhotoImages for the chat pane, built once per image
         self.image_cycle_job = None
         
         # Voice recognition setup (only if available)
@@ -306,22 +474,42 @@ class HologramCreator:
             messagebox.showerror("Save Error", f"Could not save settings: {e}")
     
     def load_saved_holograms(self):
-        """Load saved holograms from file"""
+        """Load saved holograms from the library index"""
         try:
-            if os.path.exists('holograms.json'):
-                with open('holograms.json', 'r') as f:
-                    self.saved_holograms = json.load(f)
+            self.saved_holograms = self.library.load()
         except Exception as e:
             print(f"Error loading holograms: {e}")
     
     def save_holograms_to_file(self):
-        """Save holograms to file"""
+        """Save the hologram index (images are stored by save_hologram)"""
         try:
-            with open('holograms.json', 'w') as f:
-                json.dump(self.saved_holograms, f)
+            self.library.save(self.saved_holograms)
         except Exception as e:
             print(f"Error saving holograms: {e}")
     
+    def get_hologram_rendition(self, image_info, size=DISPLAY_SIZE):
+        """Cached circular hologram rendition of one image"""
+        digest = image_info.get('sha256')
+        if digest is None:
+            digest = hashlib.sha256(self.load_image_bytes(image_info)).hexdigest()
+        return self.renditions.get(digest, size, lambda: self.load_image_bytes(image_info))
+    
+    def get_chat_photo(self, index):
+        """PhotoImage of chat-pane image index, created on first use and then reused"""
+        if self.chat_photos[index] is None:
+            image = self.get_hologram_rendition(self.current_hologram['images'][index], CHAT_SIZE)
+            self.chat_photos[index] = ImageTk.PhotoImage(image)
+        return self.chat_photos[index]
+    
+    def load_image_bytes(self, image_info):
+        """Original bytes of a hologram image, from the unsaved selection, the library or inline base64"""
+        if 'sha256' in image_info:
+            data = self.unsaved_images.get(image_info['sha256'])
+            if data is not None:
+                return data
+            return self.library.read_image(image_info['sha256'])
+        return base64.b64decode(image_info['data'])
+    
     def clear_window(self):
         """Clear all widgets from window"""
         # Cancel any existing image cycling
@@ -337,47 +525,8 @@ class HologramCreator:
         if not self.current_hologram['images']:
             return []
         
-        hologram_images = []
-        
         try:
-            for image_info in self.current_hologram['images']:
-                # Create a circular hologram for each image
-                composite_size = 300
-                composite = Image.new('RGBA', (composite_size, composite_size), (0, 0, 0, 0))
-                
-                # Create circular mask
-                mask = Image.new('L', (composite_size, composite_size), 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse((0, 0, composite_size, composite_size), fill=255)
-                
-                # Load and resize image
-                image_data = base64.b64decode(image_info['data'])
-                image = Image.open(io.BytesIO(image_data))
-                image = image.convert('RGBA')
-                image = image.resize((composite_size, composite_size), Image.Resampling.LANCZOS)
-                
-                # Apply mask
-                composite.paste(image, (0, 0))
-                composite.putalpha(mask)
-                
-                # Add holographic effect (subtle glow)
-                glow = Image.new('RGBA', (composite_size + 20, composite_size + 20), (0, 0, 0, 0))
-                glow_draw = ImageDraw.Draw(glow)
-                
-                # Create multiple glow layers
-                for i in range(5):
-                    alpha = 30 - (i * 5)
-                    glow_draw.ellipse((i, i, composite_size + 20 - i, composite_size + 20 - i), 
-                                    outline=(100, 200, 255, alpha), width=2)
-                
-                # Combine glow with composite
-                final_composite = Image.new('RGBA', (composite_size + 20, composite_size + 20), (0, 0, 0, 0))
-                final_composite.paste(glow, (0, 0))
-                final_composite.paste(composite, (10, 10), composite)
-                
-                hologram_images.append(final_composite)
-            
-            return hologram_images
+            return [self.get_hologram_rendition(image_info) for image_info in self.current_hologram['images']]
             
         except Exception as e:
             print(f"Error creating individual hologram images: {e}")
@@ -385,6 +534,10 @@ class HologramCreator:
     
     def create_merged_hologram(self):
         """Create a merged hologram from all uploaded images"""
+        # Chat-pane photos belong to the previous hologram
+        self.cycle_images = []
+        self.chat_photos = []
+        
         if not self.current_hologram['images']:
             return None
         
@@ -392,44 +545,13 @@ class HologramCreator:
         if len(self.current_hologram['images']) > 1:
             self.cycle_images = self.create_individual_hologram_images()
             if self.cycle_images:
+                self.chat_photos = [None] * len(self.cycle_images)
                 return self.cycle_images[0]  # Return first image as initial display
         
         try:
-            # Single image processing
-            composite_size = 300
-            composite = Image.new('RGBA', (composite_size, composite_size), (0, 0, 0, 0))
-            
-            # Create circular mask
-            mask = Image.new('L', (composite_size, composite_size), 0)
-            mask_draw = ImageDraw.Draw(mask)
-            mask_draw.ellipse((0, 0, composite_size, composite_size), fill=255)
-            
             # Single image - make it circular and fill the whole space
-            image_data = base64.b64decode(self.current_hologram['images'][0]['data'])
-            image = Image.open(io.BytesIO(image_data))
-            image = image.convert('RGBA')
-            image = image.resize((composite_size, composite_size), Image.Resampling.LANCZOS)
-            composite.paste(image, (0, 0))
-            
-            # Apply overall circular mask
-            composite.putalpha(mask)
-            
-            # Add holographic effect (subtle glow)
-            glow = Image.new('RGBA', (composite_size + 20, composite_size + 20), (0, 0, 0, 0))
-            glow_draw = ImageDraw.Draw(glow)
-            
-            # Create multiple glow layers
-            for i in range(5):
-                alpha = 30 - (i * 5)
-                glow_draw.ellipse((i, i, composite_size + 20 - i, composite_size + 20 - i), 
-                                outline=(100, 200, 255, alpha), width=2)
-            
-            # Combine glow with composite
-            final_composite = Image.new('RGBA', (composite_size + 20, composite_size + 20), (0, 0, 0, 0))
-            final_composite.paste(glow, (0, 0))
-            final_composite.paste(composite, (10, 10), composite)
-            
-            return final_composite
+            self.chat_photos = [None]
+            return self.get_hologram_rendition(self.current_hologram['images'][0])
             
         except Exception as e:
             print(f"Error creating merged hologram: {e}")
@@ -446,11 +568,8 @@ class HologramCreator:
         # Update the display if hologram_display exists
         if hasattr(self, 'hologram_display') and self.hologram_display.winfo_exists():
             try:
-                # Resize for chat interface
-                display_image = self.cycle_images[self.current_image_index].copy()
-                display_image = display_image.resize((280, 280), Image.Resampling.LANCZOS)
-                
-                self.hologram_photo = ImageTk.PhotoImage(display_image)
+                # Swap in the cached chat-size photo
+                self.hologram_photo = self.get_chat_photo(self.current_image_index)
                 self.hologram_display.config(image=self.hologram_photo)
                 self.hologram_display.image = self.hologram_photo  # Keep reference
             except Exception as e:
@@ -712,14 +831,17 @@ class HologramCreator:
                 break
             
             try:
-                # Convert image to base64 for storage
+                # Keep the bytes in memory until the hologram is saved, so abandoned
+                # selections never leave blobs in the library
                 with open(file_path, "rb") as image_file:
-                    encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+                    data = image_file.read()
+                digest = hashlib.sha256(data).hexdigest()
+                self.unsaved_images[digest] = data
                 
                 image_info = {
                     'name': os.path.basename(file_path),
                     'path': file_path,
-                    'data': encoded_string
+                    'sha256': digest
                 }
                 
                 self.current_hologram['images'].append(image_info)
@@ -735,6 +857,11 @@ class HologramCreator:
             index = selection[0]
             self.images_listbox.delete(index)
             del self.current_hologram['images'][index]
+            
+            # Forget bytes no remaining image refers to
+            digests = {image_info.get('sha256') for image_info in self.current_hologram['images']}
+            for digest in [d for d in self.unsaved_images if d not in digests]:
+                del self.unsaved_images[digest]
     
     def validate_and_continue_to_personality(self):
         """Validate input and continue to personality selection"""
@@ -832,6 +959,17 @@ class HologramCreator:
         # Create merged hologram
         self.merged_hologram_image = self.create_merged_hologram()
         
+        # Store the selected image bytes now that the hologram is being kept
+        try:
+            for image_info in self.current_hologram['images']:
+                data = self.unsaved_images.get(image_info.get('sha256'))
+                if data is not None:
+                    self.library.store_image(data)
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Could not store hologram images: {e}")
+            return
+        self.unsaved_images.clear()
+        
         # Save to list
         self.saved_holograms.append(self.current_hologram.copy())
         self.save_holograms_to_file()
@@ -942,20 +1080,11 @@ class HologramCreator:
         hologram_title.pack(pady=(10, 5))
         
         # Hologram display
-        if self.merged_hologram_image or self.cycle_images:
-            # Choose initial image
-            display_image = None
-            if self.cycle_images:
-                display_image = self.cycle_images[0].copy()
-                self.current_image_index = 0
-            elif self.merged_hologram_image:
-                display_image = self.merged_hologram_image.copy()
-            
-            if display_image:
-                # Resize for chat interface
-                display_image = display_image.resize((280, 280), Image.Resampling.LANCZOS)
-                
-                self.hologram_photo = ImageTk.PhotoImage(display_image)
+        if (self.merged_hologram_image or self.cycle_images) and self.chat_photos:
+            # Start with the first image's cached chat-size photo
+            self.current_image_index = 0
+            self.hologram_photo = self.get_chat_photo(0)
+            if self.hologram_photo:
                 self.hologram_display = tk.Label(left_pane, image=self.hologram_photo, bg='#2c3e50')
                 self.hologram_display.pack(pady=10)
                 
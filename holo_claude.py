@@ -14,13 +14,469 @@ import queue
 import time
 import random
 import math
+import re
+import array
+import hashlib
+import sqlite3
 import requests
+from collections import OrderedDict, deque
 from typing import List, Dict
 
 # Speech modules - loaded only if needed
 sr = None
 pyttsx3 = None
 
+# Frames pre-rendered per shimmer period (2*pi of the animation's time factor, about 3 s)
+SHIMMER_FRAMES = 32
+
+def shimmer_step(time_factor, frames_per_cycle=SHIMMER_FRAMES):
+    """Index of the pre-rendered frame closest to the given animation time factor"""
+    cycle = 2 * math.pi
+    return int((time_factor % cycle) / cycle * frames_per_cycle) % frames_per_cycle
+
+def render_shimmer_frames(layer, frames_per_cycle=SHIMMER_FRAMES):
+    """Cyan-tinted RGBA frames of one layer with the shimmering alpha, one per phase step"""
+    r, g, b, _ = layer.convert('RGBA').split()
+    
+    # Add cyan tint: the same for every frame, applied as per-band lookup tables
+    tinted = [
+        r.point(lambda v: min(255, int(v * 0.7 + 50))),
+        g.point(lambda v: min(255, int(v * 0.9 + 100))),
+        b.point(lambda v: min(255, int(v * 1.2)))
+    ]
+    
+    width, height = layer.size
+    frames = []
+    for step in range(frames_per_cycle):
+        time_factor = 2 * math.pi * step / frames_per_cycle
+        alpha = int(128 + 64 * math.sin(time_factor * 3))
+        
+        # Transparency only varies across x, so build one row and stretch it down the image
+        row = Image.new('L', (width, 1))
+        row.putdata([max(0, min(255, int(alpha + 30 * math.sin(x * 0.1 + time_factor)))) for x in range(width)])
+        frames.append(Image.merge('RGBA', tinted + [row.resize((width, height), Image.Resampling.NEAREST)]))
+    return frames
+
+class ShimmerFrameCache:
+    """Ring buffers of shimmer frames per hologram layer, rendered on a background thread"""
+    
+    def __init__(self, frames_per_cycle=SHIMMER_FRAMES, max_layers=8):
+        self.frames_per_cycle = frames_per_cycle
+        self.max_layers = max_layers
+        self.layers = []
+        self.generation = 0
+        self.rings = OrderedDict()  # layer index -> frames (PIL images until first shown)
+        self.pending = set()
+        self.failed = set()  # layers whose render raised; not retried until set_layers
+        self.lock = threading.Lock()
+        self.requests = queue.Queue()
+        threading.Thread(target=self.render_loop, daemon=True).start()
+    
+    def set_layers(self, layers):
+        """Drop cached frames and start serving a new set of layers"""
+        with self.lock:
+            self.layers = list(layers)
+            self.generation += 1
+            self.rings.clear()
+            self.pending.clear()
+            self.failed.clear()
+    
+    def request(self, layer_index):
+        """Queue a layer for rendering unless it is cached or already queued"""
+        with self.lock:
+            if (layer_index in self.rings or layer_index in self.pending or layer_index in self.failed
+                    or layer_index >= len(self.layers)):
+                return
+            self.pending.add(layer_index)
+            self.requests.put((self.generation, layer_index))
+    
+    def render_loop(self):
+        """Background worker rendering requested layers"""
+        while True:
+            generation, layer_index = self.requests.get()
+            with self.lock:
+                if generation != self.generation:
+                    continue
+                layer = self.layers[layer_index]
+            
+            try:
+                frames = render_shimmer_frames(layer, self.frames_per_cycle)
+            except Exception as e:
+                print(f"Shimmer render error (layer {layer_index}): {e}")
+                with self.lock:
+                    if generation == self.generation:
+                        self.pending.discard(layer_index)
+                        self.failed.add(layer_index)
+                continue
+            
+            with self.lock:
+                if generation == self.generation:
+                    self.pending.discard(layer_index)
+                    self.rings[layer_index] = frames
+    
+    def frame(self, layer_index, step):
+        """PhotoImage for a layer's phase step, or None while it is still rendering (Tk thread only)"""
+        with self.lock:
+            ring = self.rings.get(layer_index)
+            if ring is None:
+                return None
+            self.rings.move_to_end(layer_index)
+            
+            # Evict here rather than in the worker so PhotoImages are only freed on the Tk thread
+            while len(self.rings) > self.max_layers:
+                self.rings.popitem(last=False)
+            
+            photo = ring[step]
+            if not isinstance(photo, ImageTk.PhotoImage):
+                photo = ring[step] = ImageTk.PhotoImage(photo)
+            return photo
+
+# Whitespace after sentence-ending punctuation (and any closing quotes/brackets)
+SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+
+def pop_sentences(text):
+    """Split complete sentences off the front of streamed text; returns (sentences, remainder)"""
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    return sentences, text[start:]
+
+def iter_sse_data(lines):
+    """Decoded JSON payloads of the data: lines in a server-sent event stream"""
+    for line in lines:
+        if not line or not line.startswith('data:'):
+            continue
+        data = line[5:].strip()
+        if data != '[DONE]':  # keep reading to the end so the connection can be reused
+            yield json.loads(data)
+
+def iter_ndjson(lines):
+    """Decoded JSON objects from a newline-delimited JSON stream"""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+def anthropic_token(event):
+    """Text carried by one Anthropic messages stream event"""
+    if event.get('type') == 'error':
+        raise RuntimeError(event.get('error', {}).get('message', 'stream error'))
+    if event.get('type') == 'content_block_delta':
+        return event.get('delta', {}).get('text')
+    return None
+
+def openai_token(event):
+    """Text carried by one OpenAI chat completions chunk"""
+    if 'error' in event:
+        raise RuntimeError(event['error'].get('message', 'stream error'))
+    choices = event.get('choices') or [{}]
+    return choices[0].get('delta', {}).get('content')
+
+def ollama_token(event):
+    """Text carried by one Ollama generate chunk"""
+    if 'error' in event:
+        raise RuntimeError(event['error'])
+    return event.get('response')
+
+class LLMClient:
+    """Shared HTTP client for the LLM providers: one keep-alive session, streamed replies and timings"""
+    
+    def __init__(self):
+        self.session = requests.Session()
+        self.local = threading.local()  # last_metrics per thread, so background summaries don't mix in
+        self.history = deque(maxlen=50)
+    
+    @property
+    def last_metrics(self):
+        """Timings of the last reply streamed on the calling thread"""
+        return getattr(self.local, 'metrics', {})
+    
+    def stream(self, url, payload, token_from_event, headers=None, ndjson=False,
+               on_token=None, cancel_event=None, timeout=30):
+        """POST a streaming request and return the full reply text
+        
+        Tokens are passed to on_token as they arrive. Setting cancel_event
+        stops reading and closes the connection; the text so far is returned.
+        """
+        start = time.perf_counter()
+        first_token = None
+        cancelled = False
+        parts = []
+        self.local.metrics = {}  # A failed stream leaves no timings rather than the previous reply's
+        
+        with self.session.post(url, headers=headers, json=payload, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            response.encoding = 'utf-8'  # event streams often omit the charset
+            lines = response.iter_lines(decode_unicode=True)
+            events = iter_ndjson(lines) if ndjson else iter_sse_data(lines)
+            for event in events:
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                token = token_from_event(event)
+                if not token:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter()
+                parts.append(token)
+                if on_token:
+                    on_token(token)
+        
+        end = time.perf_counter()
+        self.local.metrics = {
+            'url': url,
+            'ttft': (first_token - start) if first_token else None,
+            'total': end - start,
+            'chars': sum(len(part) for part in parts),
+            'cancelled': cancelled
+        }
+        self.history.append(self.local.metrics)
+        return ''.join(parts)
+    
+    def record_cached_reply(self):
+        """Note that the calling thread's last reply came from the response cache"""
+        self.local.metrics = {'cached': True}
+    
+    def describe_last(self):
+        """Short timing summary of the last reply for the status bar"""
+        metrics = self.last_metrics
+        if metrics.get('cached'):
+            return "cached reply"
+        if not metrics or metrics['ttft'] is None:
+            return ""
+        return f"first token {metrics['ttft']:.2f}s, total {metrics['total']:.1f}s"
+
+# Barge-in needs speech this many times louder than the recognizer's threshold
+BARGE_IN_ENERGY_FACTOR = 3.0
+
+class SpeechPipeline:
+    """Speaks queued sentences on a dedicated TTS thread so replies can be spoken while still streaming"""
+    
+    def __init__(self, engine_factory):
+        self.engine_factory = engine_factory  # called on the TTS thread, e.g. pyttsx3.init
+        self.engine = None
+        self.sentences = queue.Queue()
+        self.generation = 0
+        self.pending = 0  # sentences queued or being spoken
+        self.stop_requested = False
+        self.speaking = False
+        self.lock = threading.Lock()
+        threading.Thread(target=self.run, daemon=True).start()
+    
+    def say(self, text, rate=200):
+        """Queue a sentence behind anything already waiting to be spoken"""
+        with self.lock:
+            self.pending += 1
+            self.sentences.put((self.generation, text, rate))
+    
+    def cancel(self):
+        """Drop queued sentences and cut off the one being spoken (barge-in)"""
+        with self.lock:
+            self.generation += 1
+            while True:
+                try:
+                    self.sentences.get_nowait()
+                except queue.Empty:
+                    break
+                self.pending -= 1
+            self.stop_requested = self.speaking
+    
+    def busy(self):
+        """True from say() until that sentence has been spoken or cancelled, with no gap at dequeue"""
+        with self.lock:
+            return self.pending > 0
+    
+    def on_word(self, name, location, length):
+        """Engine callback between words; stopping here keeps all engine calls on the TTS thread"""
+        if self.stop_requested:
+            self.engine.stop()
+    
+    def run(self):
+        """TTS worker loop; the engine is created here so every engine call stays on this thread"""
+        try:
+            self.engine = self.engine_factory()
+            self.engine.connect('started-word', self.on_word)
+        except Exception as e:
+            print(f"TTS Error: {e}")
+            self.engine = None
+        
+        while True:
+            generation, text, rate = self.sentences.get()
+            with self.lock:
+                if generation != self.generation or self.engine is None:
+                    self.pending -= 1
+                    continue
+                self.speaking = True
+                self.stop_requested = False
+            try:
+                self.engine.setProperty('rate', rate)
+                self.engine.say(text)
+                self.engine.runAndWait()
+            except Exception as e:
+                print(f"TTS Error: {e}")
+            finally:
+                with self.lock:
+                    self.speaking = False
+                    self.stop_requested = False
+                    self.pending -= 1
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) used for context budgeting"""
+    return len(text) // 4 + 4
+
+def truncate_to_tokens(text, max_tokens):
+    """Longest prefix of text that estimate_tokens puts within max_tokens"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max(0, (max_tokens - 4) * 4 + 3)]
+
+class ConversationContext:
+    """Token-budgeted conversation window; turns that fall out of it are folded into a running summary"""
+    
+    def __init__(self, max_tokens=2000, summarizer=None):
+        self.max_tokens = max_tokens
+        self.summarizer = summarizer  # summarizer(summary, messages) -> new summary
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Forget the whole conversation"""
+        with self.lock:
+            self.messages = []         # {'role', 'content', 'tokens'}; token counts computed once
+            self.start = 0             # first message inside the window
+            self.window_tokens = 0
+            self.summary = ""
+            self.summarized_upto = 0   # messages before this index are covered by the summary
+            self.summarizing = False
+            self.cached_window = None
+            self.generation = getattr(self, 'generation', 0) + 1
+    
+    def add_exchange(self, user_text, assistant_text):
+        """Record a user message and the reply, then trim the window back under budget"""
+        with self.lock:
+            for role, content in (("user", user_text), ("assistant", assistant_text)):
+                tokens = estimate_tokens(content)
+                self.messages.append({"role": role, "content": content, "tokens": tokens})
+                self.window_tokens += tokens
+            self.cached_window = None
+            
+            # Drop whole exchanges from the front so the window always starts with a user turn
+            budget = self.max_tokens - estimate_tokens(self.summary)
+            while self.window_tokens > budget and len(self.messages) - self.start > 2:
+                self.window_tokens -= self.messages[self.start]["tokens"] + self.messages[self.start + 1]["tokens"]
+                self.start += 2
+                self.cached_window = None
+            
+            start_summary = (self.summarizer is not None and not self.summarizing
+                             and self.start > self.summarized_upto)
+            if start_summary:
+                self.summarizing = True
+        
+        if start_summary:
+            threading.Thread(target=self.summarize_dropped, daemon=True).start()
+    
+    def window(self):
+        """Messages inside the budget, ready to send; reused until the window changes"""
+        with self.lock:
+            if self.cached_window is None:
+                self.cached_window = [{"role": m["role"], "content": m["content"]}
+                                      for m in self.messages[self.start:]]
+            return self.cached_window
+    
+    def summarize_dropped(self):
+        """Background worker folding turns that left the window into the summary"""
+        while True:
+            with self.lock:
+                generation = self.generation
+                upto = self.start
+                summary = self.summary
+                dropped = [{"role": m["role"], "content": m["content"]}
+                           for m in self.messages[self.summarized_upto:upto]]
+            
+            try:
+                new_summary = self.summarizer(summary, dropped).strip()
+            except Exception as e:
+                print(f"Summary Error: {e}")
+                new_summary = None
+            
+            with self.lock:
+                if generation != self.generation:
+                    return
+                if new_summary:
+                    # Keep the summary to a quarter of the budget whatever the model returns
+                    self.summary = truncate_to_tokens(new_summary, self.max_tokens // 4)
+                self.summarized_upto = upto
+                
+                # Messages may have been dropped while this one ran
+                if self.start <= self.summarized_upto:
+                    self.summarizing = False
+                    return
+
+class ResponseCache:
+    """SQLite-backed reply cache keyed on the normalized prompt, conversation state, personality and model settings"""
+    
+    def __init__(self, path='response_cache.db', ttl=7 * 24 * 3600, max_entries=2000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, response TEXT, created REAL, last_used REAL, hits INTEGER DEFAULT 0)""")
+            self.conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+    
+    @staticmethod
+    def make_key(prompt, system, model, temperature, max_tokens, window=(), summary=""):
+        """Cache key; prompts differing only in case, punctuation or spacing share an entry
+        
+        The context window and summary are part of the key, so a reply is only
+        reused for the same prompt at the same point of the same conversation
+        (in practice, context-free turns such as an opening greeting).
+        """
+        normalized = ' '.join(re.sub(r'[^\w\s]', ' ', prompt.lower()).split())
+        bucket = round(float(temperature) * 4) / 4
+        context = hashlib.sha256(json.dumps([list(window), summary]).encode('utf-8')).hexdigest()
+        return hashlib.sha256(json.dumps([normalized, system, model, bucket, max_tokens, context])
+                              .encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """Cached reply for key, or None if missing or older than the TTL"""
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] < now - self.ttl:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+    
+    def put(self, key, response):
+        """Store a reply, evicting the least recently used entries beyond max_entries"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                              (key, response, now, now))
+            excess = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute("DELETE FROM responses WHERE key IN "
+                                  "(SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)", (excess,))
+    
+    def describe(self):
+        """Hit rate for this session, for the status bar"""
+        lookups = self.hits + self.misses
+        if not lookups:
+            return ""
+        return f"cache hits {self.hits}/{lookups} ({100 * self.hits / lookups:.0f}%)"
+
 class HologramChat:
     def __init__(self):
         self.root = tk.Tk()
@@ -32,7 +488,7 @@ class HologramChat:
         self.hologram_data = None
         self.personality_traits = {}
         self.chat_history = []
-        self.conversation_history = []  # For maintaining LLM context
+        self.context = ConversationContext(summarizer=self.summarize_turns)  # For maintaining LLM context
         self.is_listening = False
         self.animation_running = False
         self.voice_enabled = False
@@ -40,7 +496,7 @@ class HologramChat:
         # Speech components (loaded only if needed)
         self.recognizer = None
         self.microphone = None
-        self.tts_engine = None
+        self.speech = None
         
         # AI Configuration
         self.ai_config = {
@@ -49,12 +505,25 @@ class HologramChat:
             'model': 'claude-3-sonnet-20240229',
             'base_url': '',  # For local models like Ollama
             'max_tokens': 150,
-            'temperature': 0.7
+            'temperature': 0.7,
+            'context_tokens': 2000,  # Budget for conversation history sent with each request
+            'cache_providers': []  # Providers whose replies may be served from the response cache
         }
         
+        # Streaming LLM client and the cancel flag of the reply in progress
+        self.llm_client = LLMClient()
+        self.reply_cancel = None
+        self.reply_active = False
+        self.reply_lock = threading.Lock()  # reply_active and the speech queue change hands under it
+        self.response_cache = None  # Opened on first use by a provider that opts in
+        self.personality_prompt_cache = None
+        
         # Animation variables
         self.hologram_frame = 0
         self.hologram_layers = []
+        self.shimmer_cache = ShimmerFrameCache()
+        self.hologram_image_item = None
+        self.hologram_border_item = None
         
         # GUI setup
         self.setup_gui()
@@ -92,7 +561,8 @@ class HologramChat:
             
             self.recognizer = sr.Recognizer()
             self.microphone = sr.Microphone()
-            self.tts_engine = pyttsx3.init()
+            if self.speech is None:
+                self.speech = SpeechPipeline(pyttsx3.init)
             self.voice_enabled = True
             
             self.voice_status_label.config(text="Voice: Enabled", fg='green')
@@ -166,32 +636,82 @@ class HologramChat:
         # Add user message to chat
         self.add_to_chat("You", message)
         
+        # A new message supersedes any reply still streaming
+        self.cancel_reply()
+        
         # Get AI response in separate thread
         response_thread = threading.Thread(target=self.get_ai_response, args=(message,))
         response_thread.daemon = True
         response_thread.start()
 
-    def get_ai_response(self, user_input):
+    def get_ai_response(self, user_input, ready_text="Ready"):
         """Get AI response in background thread"""
         try:
             self.root.after(0, lambda: self.status_label.config(text="AI thinking..."))
             
-            response = self.call_llm(user_input)
+            self.stream_reply(user_input)
             
-            # Add AI response to chat
-            self.root.after(0, lambda: self.add_to_chat("AI", response))
-            
-            # Speak response if voice is enabled
-            if self.voice_enabled:
-                self.root.after(0, lambda: self.speak_response(response))
-                
-            self.root.after(0, lambda: self.status_label.config(text="Ready"))
+            timing = self.llm_client.describe_last()
+            if self.cache_enabled():
+                timing = ", ".join(part for part in (timing, self.get_response_cache().describe()) if part)
+            status = f"{ready_text} ({timing})" if timing else ready_text
+            self.root.after(0, lambda: self.status_label.config(text=status))
             
         except Exception as e:
             error_msg = f"AI Error: {str(e)}"
             self.root.after(0, lambda: self.add_to_chat("System", error_msg))
             self.root.after(0, lambda: self.status_label.config(text="AI Error"))
 
+    def stream_reply(self, user_input):
+        """Get the reply to user_input, showing tokens as they arrive and speaking each finished sentence"""
+        cancel_event = threading.Event()
+        self.reply_cancel = cancel_event
+        self.reply_active = True
+        state = {'started': False, 'pending': ''}
+        
+        def on_token(token):
+            if not state['started']:
+                state['started'] = True
+                self.root.after(0, lambda: self.begin_chat_stream("AI"))
+            self.root.after(0, lambda: self.append_chat_stream(token))
+            
+            # Queue each sentence for the TTS worker as soon as it is complete
+            if self.voice_enabled and not cancel_event.is_set():
+                sentences, state['pending'] = pop_sentences(state['pending'] + token)
+                for sentence in sentences:
+                    self.speak_response(sentence)
+        
+        try:
+            # Errors propagate so get_ai_response reports them even after part of the reply was shown
+            response = self.call_llm(user_input, on_token=on_token, cancel_event=cancel_event, raise_errors=True)
+            
+            # Queue the last sentence before reply_active clears so the reply never looks finished early
+            if not state['started']:
+                # Empty replies arrive as one message
+                self.root.after(0, lambda: self.add_to_chat("AI", response))
+                if self.voice_enabled:
+                    self.speak_response(response)
+            elif self.voice_enabled and state['pending'].strip() and not cancel_event.is_set():
+                self.speak_response(state['pending'].strip())
+        finally:
+            with self.reply_lock:
+                if self.reply_cancel is cancel_event:
+                    self.reply_active = False
+        return response
+
+    def cancel_reply(self):
+        """Stop streaming and speaking the reply in progress, if any"""
+        if self.reply_cancel is not None:
+            self.reply_cancel.set()
+        if self.speech is not None:
+            self.speech.cancel()
+
+    def reply_in_progress(self):
+        """True while a reply is still streaming or being spoken"""
+        with self.reply_lock:
+            streaming = self.reply_cancel is not None and not self.reply_cancel.is_set() and self.reply_active
+            return streaming or (self.speech is not None and self.speech.busy())
+
     def setup_gui(self):
         """Setup the main GUI interface"""
         # Main frame
@@ -445,17 +965,21 @@ class HologramChat:
 
     def start_hologram_animation(self):
         """Start the hologram animation"""
-        self.animation_running = True
-        self.animate_hologram()
+        # Frames for the new layers are rendered in the background; the loop only swaps them in
+        self.shimmer_cache.set_layers(self.hologram_layers)
+        self.hologram_canvas.delete("all")
+        self.hologram_image_item = None
+        self.hologram_border_item = None
+        
+        if not self.animation_running:
+            self.animation_running = True
+            self.animate_hologram()
 
     def animate_hologram(self):
         """Animate the hologram display"""
         if not self.animation_running or not self.hologram_layers:
             return
         
-        # Clear canvas
-        self.hologram_canvas.delete("all")
-        
         # Get canvas dimensions
         canvas_width = self.hologram_canvas.winfo_width()
         canvas_height = self.hologram_canvas.winfo_height()
@@ -466,48 +990,33 @@ class HologramChat:
         
         # Calculate animation parameters
         time_factor = time.time() * 2
-        layer_index = int(time_factor) % len(self.hologram_layers)
-        
-        # Get current layer
-        current_layer = self.hologram_layers[layer_index]
-        
-        # Apply animation effects
-        # Simulate holographic shimmer
-        alpha = int(128 + 64 * math.sin(time_factor * 3))
-        
-        # Create animated version
-        animated_layer = current_layer.copy()
-        if animated_layer.mode != 'RGBA':
-            animated_layer = animated_layer.convert('RGBA')
-        
-        # Apply transparency for holographic effect
-        pixels = animated_layer.load()
-        for y in range(animated_layer.height):
-            for x in range(animated_layer.width):
-                r, g, b, a = pixels[x, y]
-                # Add cyan tint and transparency variation
-                r = min(255, int(r * 0.7 + 50))
-                g = min(255, int(g * 0.9 + 100))
-                b = min(255, int(b * 1.2))
-                a = int(alpha + 30 * math.sin(x * 0.1 + time_factor))
-                pixels[x, y] = (r, g, b, max(0, min(255, a)))
-        
-        # Convert to PhotoImage
-        photo = ImageTk.PhotoImage(animated_layer)
-        
-        # Center on canvas
-        x = (canvas_width - animated_layer.width) // 2
-        y = (canvas_height - animated_layer.height) // 2
-        
-        self.hologram_canvas.create_image(x, y, anchor='nw', image=photo)
-        
-        # Keep reference to prevent garbage collection
-        self.hologram_canvas.image = photo
-        
-        # Add holographic border effect
-        self.hologram_canvas.create_rectangle(x-2, y-2, x+animated_layer.width+2, 
-                                            y+animated_layer.height+2, 
-                                            outline='cyan', width=2)
+        layer_count = len(self.hologram_layers)
+        layer_index = int(time_factor) % layer_count
+        step = shimmer_step(time_factor, self.shimmer_cache.frames_per_cycle)
+        
+        # Have the next layer's frames ready before it comes up
+        self.shimmer_cache.request(layer_index)
+        self.shimmer_cache.request((layer_index + 1) % layer_count)
+        
+        photo = self.shimmer_cache.frame(layer_index, step)
+        if photo is not None:
+            # Center on canvas
+            x = (canvas_width - photo.width()) // 2
+            y = (canvas_height - photo.height()) // 2
+            
+            if self.hologram_image_item is None:
+                self.hologram_image_item = self.hologram_canvas.create_image(x, y, anchor='nw', image=photo)
+                # Add holographic border effect
+                self.hologram_border_item = self.hologram_canvas.create_rectangle(
+                    x-2, y-2, x+photo.width()+2, y+photo.height()+2, outline='cyan', width=2)
+            else:
+                self.hologram_canvas.itemconfig(self.hologram_image_item, image=photo)
+                self.hologram_canvas.coords(self.hologram_image_item, x, y)
+                self.hologram_canvas.coords(self.hologram_border_item,
+                                            x-2, y-2, x+photo.width()+2, y+photo.height()+2)
+            
+            # Keep reference to prevent garbage collection
+            self.hologram_canvas.image = photo
         
         # Schedule next frame
         self.root.after(100, self.animate_hologram)
@@ -589,14 +1098,24 @@ class HologramChat:
         tokens_entry = tk.Entry(dialog, textvariable=tokens_var, width=10)
         tokens_entry.pack(pady=5)
         
+        # Response cache (per provider)
+        cache_var = tk.BooleanVar(value=self.cache_enabled())
+        tk.Checkbutton(dialog, text="Reuse cached replies to repeated messages for this provider",
+                      variable=cache_var, bg='black', fg='white', selectcolor='darkblue').pack(pady=5)
+        
         def save_config():
+            cache_providers = [p for p in self.ai_config.get('cache_providers', []) if p != provider_var.get()]
+            if cache_var.get():
+                cache_providers.append(provider_var.get())
+            
             self.ai_config.update({
                 'provider': provider_var.get(),
                 'api_key': api_key_var.get(),
                 'model': model_var.get(),
                 'base_url': base_url_var.get(),
                 'temperature': temp_var.get(),
-                'max_tokens': tokens_var.get()
+                'max_tokens': tokens_var.get(),
+                'cache_providers': cache_providers
             })
             
             self.save_ai_config()
@@ -689,11 +1208,20 @@ class HologramChat:
         tk.Button(dialog, text="Save Traits", command=save_traits,
                  bg='darkgreen', fg='white').pack(pady=20)
 
-    def create_personality_prompt(self, user_input: str) -> str:
-        """Create a system prompt that incorporates personality traits"""
+    def create_personality_prompt(self) -> str:
+        """Create a system prompt that incorporates personality traits
+        
+        The prompt only depends on the personality, so it stays byte-identical
+        across turns and providers can cache it.
+        """
         traits = self.personality_traits.get('traits', [])
         intensity = self.personality_traits.get('intensity', 0.5)
         
+        # Only rebuild when the personality changes
+        cache_key = (tuple(traits), intensity)
+        if self.personality_prompt_cache and self.personality_prompt_cache[0] == cache_key:
+            return self.personality_prompt_cache[1]
+        
         if not traits:
             personality_desc = "a helpful AI assistant"
         else:
@@ -730,35 +1258,96 @@ class HologramChat:
 
 Keep your responses conversational and natural, as if speaking aloud. Avoid overly formal language or lengthy explanations unless specifically asked. Your responses should feel like natural speech that works well when converted to audio.
 
-Remember your personality traits and respond accordingly, but don't overdo it - be natural while maintaining your character.
-
-User said: "{user_input}"
-
-Respond in a way that matches your personality:"""
+Remember your personality traits and respond accordingly, but don't overdo it - be natural while maintaining your character."""
         
+        self.personality_prompt_cache = (cache_key, system_prompt)
         return system_prompt
 
-    def call_llm(self, user_input: str, config=None) -> str:
-        """Make API call to the configured LLM"""
+    def call_llm(self, user_input: str, config=None, on_token=None, cancel_event=None, raise_errors=False) -> str:
+        """Make API call to the configured LLM, streaming tokens to on_token if given
+        
+        Errors come back as an "AI Error: ..." reply unless raise_errors is set.
+        """
         if config is None:
             config = self.ai_config
         
-        provider = config['provider']
-        
         try:
-            if provider == 'anthropic':
-                return self.call_anthropic(user_input, config)
-            elif provider == 'openai':
-                return self.call_openai(user_input, config)
-            elif provider == 'local':
-                return self.call_local_llm(user_input, config)
-            else:
-                raise ValueError(f"Unknown provider: {provider}")
+            system = self.create_personality_prompt()
+            window = self.context.window()
+            summary = self.context.summary
+            
+            # Repeated small talk can be answered from the cache for providers that opt in;
+            # the key covers the conversation so far, so follow-ups like "yes" never replay
+            cache_key = None
+            if self.cache_enabled(config):
+                cache = self.get_response_cache()
+                cache_key = cache.make_key(user_input, system, config['model'], config['temperature'],
+                                           config['max_tokens'], window, summary)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    self.llm_client.record_cached_reply()
+                    if on_token:
+                        on_token(cached)
+                    self.context.add_exchange(user_input, cached)
+                    return cached
+            
+            messages = window + [{"role": "user", "content": user_input}]
+            notes = f"Earlier in this conversation: {summary}" if summary else ""
+            ai_response = self.call_provider(system, messages, config, notes, on_token, cancel_event)
+            
+            # Cut-off replies are not worth repeating
+            if cache_key and ai_response and not (cancel_event and cancel_event.is_set()):
+                cache.put(cache_key, ai_response)
+            
+            # Update conversation history
+            self.context.add_exchange(user_input, ai_response)
+            return ai_response
                 
         except Exception as e:
+            if raise_errors:
+                raise
             return f"AI Error: {str(e)}"
 
-    def call_anthropic(self, user_input: str, config: dict) -> str:
+    def cache_enabled(self, config=None):
+        """True if the response cache is switched on for the configured provider"""
+        config = config or self.ai_config
+        return config.get('provider') in config.get('cache_providers', [])
+
+    def get_response_cache(self):
+        """The shared response cache, opened on first use"""
+        if self.response_cache is None:
+            self.response_cache = ResponseCache()
+        return self.response_cache
+
+    def call_provider(self, system: str, messages: list, config=None, notes: str = "",
+                      on_token=None, cancel_event=None) -> str:
+        """Send a system prompt, optional notes and messages to the configured provider"""
+        if config is None:
+            config = self.ai_config
+        
+        provider = config['provider']
+        
+        if provider == 'anthropic':
+            return self.call_anthropic(system, messages, config, notes, on_token, cancel_event)
+        elif provider == 'openai':
+            return self.call_openai(system, messages, config, notes, on_token, cancel_event)
+        elif provider == 'local':
+            return self.call_local_llm(system, messages, config, notes, on_token, cancel_event)
+        else:
+            raise ValueError(f"Unknown provider: {provider}")
+
+    def summarize_turns(self, summary: str, messages: list) -> str:
+        """Fold turns that left the context window into the running summary (summary thread)"""
+        transcript = "\n".join(f"{'User' if m['role'] == 'user' else 'You'}: {m['content']}" for m in messages)
+        request = (f"Summary so far: {summary or '(none)'}\n\n"
+                   f"Conversation lines to add:\n{transcript}\n\n"
+                   "Write the updated summary in under 80 words. Keep names, facts and anything the user asked you to remember.")
+        config = dict(self.ai_config, temperature=0.2, max_tokens=200)
+        return self.call_provider("You keep short running summaries of conversations.",
+                                  [{"role": "user", "content": request}], config)
+
+    def call_anthropic(self, system: str, messages: list, config: dict, notes: str = "",
+                       on_token=None, cancel_event=None) -> str:
         """Call Anthropic Claude API"""
         url = "https://api.anthropic.com/v1/messages"
         
@@ -768,36 +1357,25 @@ Respond in a way that matches your personality:"""
             "anthropic-version": "2023-06-01"
         }
         
-        # Build conversation history
-        messages = []
-        for msg in self.conversation_history[-10:]:  # Keep last 10 exchanges
-            messages.append(msg)
-        
-        # Add current message with personality context
-        system_prompt = self.create_personality_prompt(user_input)
-        messages.append({"role": "user", "content": user_input})
+        # The personality prompt is identical every turn, so mark it cacheable; the summary follows it
+        system_blocks = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        if notes:
+            system_blocks.append({"type": "text", "text": notes})
         
         payload = {
             "model": config['model'],
             "max_tokens": config['max_tokens'],
             "temperature": config['temperature'],
-            "system": system_prompt,
-            "messages": messages
+            "system": system_blocks,
+            "messages": messages,
+            "stream": True
         }
         
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        ai_response = result['content'][0]['text']
-        
-        # Update conversation history
-        self.conversation_history.append({"role": "user", "content": user_input})
-        self.conversation_history.append({"role": "assistant", "content": ai_response})
-        
-        return ai_response
+        return self.llm_client.stream(url, payload, anthropic_token, headers=headers,
+                                      on_token=on_token, cancel_event=cancel_event, timeout=30)
 
-    def call_openai(self, user_input: str, config: dict) -> str:
+    def call_openai(self, system: str, messages: list, config: dict, notes: str = "",
+                    on_token=None, cancel_event=None) -> str:
         """Call OpenAI GPT API"""
         url = "https://api.openai.com/v1/chat/completions"
         
@@ -806,66 +1384,48 @@ Respond in a way that matches your personality:"""
             "Authorization": f"Bearer {config['api_key']}"
         }
         
-        # Build conversation history
-        messages = [{"role": "system", "content": self.create_personality_prompt(user_input)}]
-        
-        for msg in self.conversation_history[-10:]:  # Keep last 10 exchanges
-            messages.append(msg)
-        
-        messages.append({"role": "user", "content": user_input})
+        # Stable system prompt first so the prompt prefix can be cached
+        full_messages = [{"role": "system", "content": system}]
+        if notes:
+            full_messages.append({"role": "system", "content": notes})
+        full_messages.extend(messages)
         
         payload = {
             "model": config['model'],
-            "messages": messages,
+            "messages": full_messages,
             "max_tokens": config['max_tokens'],
-            "temperature": config['temperature']
+            "temperature": config['temperature'],
+            "stream": True
         }
         
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        ai_response = result['choices'][0]['message']['content']
-        
-        # Update conversation history
-        self.conversation_history.append({"role": "user", "content": user_input})
-        self.conversation_history.append({"role": "assistant", "content": ai_response})
-        
-        return ai_response
+        return self.llm_client.stream(url, payload, openai_token, headers=headers,
+                                      on_token=on_token, cancel_event=cancel_event, timeout=30)
 
-    def call_local_llm(self, user_input: str, config: dict) -> str:
+    def call_local_llm(self, system: str, messages: list, config: dict, notes: str = "",
+                       on_token=None, cancel_event=None) -> str:
         """Call local LLM (like Ollama)"""
         url = f"{config['base_url']}/api/generate"
         
-        # Build context from conversation history
-        context = self.create_personality_prompt(user_input)
-        for msg in self.conversation_history[-6:]:  # Keep last 6 exchanges for context
+        # Build context from the conversation window; the personality goes in the separate system field
+        parts = [notes] if notes else []
+        for msg in messages:
             role = "Human" if msg["role"] == "user" else "Assistant"
-            context += f"\n\n{role}: {msg['content']}"
-        
-        context += f"\n\nHuman: {user_input}\n\nAssistant:"
+            parts.append(f"{role}: {msg['content']}")
+        context = "\n\n".join(parts) + "\n\nAssistant:"
         
         payload = {
             "model": config['model'],
+            "system": system,
             "prompt": context,
-            "stream": False,
+            "stream": True,
             "options": {
                 "temperature": config['temperature'],
                 "num_predict": config['max_tokens']
             }
         }
         
-        response = requests.post(url, json=payload, timeout=60)
-        response.raise_for_status()
-        
-        result = response.json()
-        ai_response = result['response'].strip()
-        
-        # Update conversation history
-        self.conversation_history.append({"role": "user", "content": user_input})
-        self.conversation_history.append({"role": "assistant", "content": ai_response})
-        
-        return ai_response
+        return self.llm_client.stream(url, payload, ollama_token, ndjson=True,
+                                      on_token=on_token, cancel_event=cancel_event, timeout=60).strip()
 
     def start_chat(self):
         """Start the chat session"""
@@ -882,7 +1442,8 @@ Respond in a way that matches your personality:"""
             return
         
         self.is_listening = True
-        self.conversation_history = []  # Reset conversation history
+        self.context.max_tokens = self.ai_config.get('context_tokens', 2000)
+        self.context.reset()  # Reset conversation history
         self.start_button.config(state='disabled')
         self.stop_button.config(state='normal')
         
@@ -905,6 +1466,7 @@ Respond in a way that matches your personality:"""
     def stop_chat(self):
         """Stop the chat session"""
         self.is_listening = False
+        self.cancel_reply()
         self.start_button.config(state='normal')
         self.stop_button.config(state='disabled')
         self.status_label.config(text="Ready")
@@ -923,9 +1485,16 @@ Respond in a way that matches your personality:"""
             try:
                 # Listen for audio
                 with self.microphone as source:
+                    # While a reply is streaming or playing, watch for the user starting to talk
+                    if self.reply_in_progress():
+                        self.wait_for_barge_in(source)
                     self.status_label.config(text="Voice mode - Listening...")
                     audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=5)
                 
+                # A phrase captured over the end of a reply still interrupts it
+                if self.reply_in_progress():
+                    self.cancel_reply()
+                
                 # Recognize speech
                 self.status_label.config(text="Processing speech...")
                 text = self.recognizer.recognize_google(audio)
@@ -937,22 +1506,12 @@ Respond in a way that matches your personality:"""
                 # Add user input to chat
                 self.root.after(0, lambda: self.add_to_chat("You", text))
                 
-                # Generate AI response using LLM
-                self.root.after(0, lambda: self.status_label.config(text="AI thinking..."))
-                
-                try:
-                    response = self.call_llm(text)
-                    
-                    # Add AI response to chat and speak it
-                    self.root.after(0, lambda: self.add_to_chat("AI", response))
-                    if self.voice_enabled:
-                        self.root.after(0, lambda: self.speak_response(response))
-                    self.root.after(0, lambda: self.status_label.config(text="Voice mode - Listening..."))
-                    
-                except Exception as e:
-                    error_msg = f"AI Error: {str(e)}"
-                    self.root.after(0, lambda: self.add_to_chat("System", error_msg))
-                    self.root.after(0, lambda: self.status_label.config(text="AI Error - Try again"))
+                # Generate the reply on its own thread so listening (and barge-in) continues
+                # while tokens stream in and sentences are spoken
+                reply_thread = threading.Thread(target=self.get_ai_response,
+                                                args=(text, "Voice mode - Listening..."))
+                reply_thread.daemon = True
+                reply_thread.start()
                 
             except sr.WaitTimeoutError:
                 pass
@@ -963,6 +1522,17 @@ Respond in a way that matches your personality:"""
             except Exception as e:
                 self.root.after(0, lambda: self.add_to_chat("System", f"Voice error: {e}"))
 
+    def wait_for_barge_in(self, source):
+        """Poll the microphone until the reply finishes or the user talks over it, which cancels the reply"""
+        # The hologram's own voice reaches the microphone too, so interrupting needs louder speech
+        threshold = self.recognizer.energy_threshold * BARGE_IN_ENERGY_FACTOR
+        while self.is_listening and self.reply_in_progress():
+            samples = array.array('h', source.stream.read(source.CHUNK))
+            if samples and math.sqrt(sum(s * s for s in samples) / len(samples)) > threshold:
+                self.cancel_reply()
+                self.root.after(0, lambda: self.status_label.config(text="Interrupted - Listening..."))
+                return
+
     def generate_response(self, user_input):
         """Generate AI response based on personality traits (LEGACY - kept for fallback)"""
         # This method is kept as a fallback if LLM calls fail
@@ -1013,24 +1583,19 @@ Respond in a way that matches your personality:"""
         return base_response
 
     def speak_response(self, text):
-        """Convert text to speech - only if voice is enabled"""
-        if not self.voice_enabled or not self.tts_engine:
+        """Queue text for the TTS worker - only if voice is enabled"""
+        if not self.voice_enabled or not self.speech:
             return
             
-        try:
-            # Adjust speech rate based on personality
-            rate = 200  # Default rate
+        # Adjust speech rate based on personality
+        rate = 200  # Default rate
+        
+        if 'talkative' in self.personality_traits.get('traits', []):
+            rate = 250
+        elif 'quiet' in self.personality_traits.get('traits', []):
+            rate = 150
             
-            if 'talkative' in self.personality_traits.get('traits', []):
-                rate = 250
-            elif 'quiet' in self.personality_traits.get('traits', []):
-                rate = 150
-                
-            self.tts_engine.setProperty('rate', rate)
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
-        except Exception as e:
-            print(f"TTS Error: {e}")
+        self.speech.say(text, rate)
 
     def add_to_chat(self, speaker, message):
         """Add message to chat display"""
@@ -1060,6 +1625,19 @@ Respond in a way that matches your personality:"""
             self.chat_text.tag_add("system", line_start, line_end)
             self.chat_text.tag_config("system", foreground="yellow")
 
+    def begin_chat_stream(self, speaker):
+        """Start a chat line that streamed text is appended to"""
+        self.add_to_chat(speaker, "")
+        
+        # Mark the end of the new line (before its newline); right gravity keeps it after inserted text
+        self.chat_text.mark_set("stream_end", "end-2c")
+        self.chat_text.mark_gravity("stream_end", "right")
+
+    def append_chat_stream(self, text):
+        """Append streamed AI text to the line started by begin_chat_stream"""
+        self.chat_text.insert("stream_end", text, "ai")
+        self.chat_text.see(tk.END)
+
     def run(self):
         """Start the application"""
         self.root.mainloop()
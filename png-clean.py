@@ -3,9 +3,118 @@ import numpy as np
 from PIL import Image
 import os
 import argparse
+import tempfile
+import time
+import json
+import hashlib
+import struct
+import zlib
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
 
+def white_background_mask(bgr, threshold=240, tolerance=20):
+    """Closed 0/1 mask of white/light background pixels in a BGR image
+    
+    Same result as white_background_mask_reference. Of its four tests, pure
+    white implies near-white (or the reverse for a negative tolerance) and
+    bright-and-uniform implies bright, so the union is just "every channel
+    >= the lower of the two thresholds" or "gray >= threshold": one inRange
+    and one threshold, with no variance pass and no full-size bool arrays.
+    """
+    lower = min(threshold, threshold - tolerance)
+    background_mask = cv2.inRange(bgr, (lower, lower, lower), (255, 255, 255))
+    cv2.min(background_mask, 1, dst=background_mask)
+    
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    _, bright_mask = cv2.threshold(gray, threshold - 1, 1, cv2.THRESH_BINARY)
+    cv2.bitwise_or(background_mask, bright_mask, dst=background_mask)
+    
+    # Clean up the mask
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    return cv2.morphologyEx(background_mask, cv2.MORPH_CLOSE, kernel)
+
+def white_background_mask_reference(bgr, threshold=240, tolerance=20):
+    """Original multi-pass version of white_background_mask, kept for --benchmark-mask"""
+    # Convert to RGB for processing
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    
+    # Multiple methods to detect background
+    methods_masks = []
+    
+    # Method 1: Pure white detection
+    white_mask = np.all(rgb >= threshold, axis=2)
+    methods_masks.append(white_mask)
+    
+    # Method 2: Near-white with tolerance
+    near_white = np.all(rgb >= threshold - tolerance, axis=2)
+    methods_masks.append(near_white)
+    
+    # Method 3: Brightness-based
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    bright_mask = gray >= threshold
+    methods_masks.append(bright_mask)
+    
+    # Method 4: Color variance (low variance = likely background)
+    variance = np.var(rgb, axis=2)
+    low_variance_mask = variance < 100  # Low color variance
+    bright_and_uniform = bright_mask & low_variance_mask
+    methods_masks.append(bright_and_uniform)
+    
+    # Combine methods - pixel is background if multiple methods agree
+    background_mask = np.zeros_like(white_mask)
+    for mask in methods_masks:
+        background_mask = background_mask | mask
+        
+    # Clean up the mask
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    return cv2.morphologyEx(background_mask.astype(np.uint8), cv2.MORPH_CLOSE, kernel)
+
+def benchmark_white_background_mask(repeats=3):
+    """Time the fused and reference background masks on synthetic 4K and 8K images and check they agree"""
+    rng = np.random.default_rng(0)
+    all_equal = True
+    for label, (width, height) in (("4K", (3840, 2160)), ("8K", (7680, 4320))):
+        # Bright noisy background with darker and mid-tone blobs to exercise every test
+        bgr = rng.integers(200, 256, (height, width, 3), dtype=np.uint8)
+        for _ in range(40):
+            center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            color = tuple(int(c) for c in rng.integers(0, 256, 3))
+            cv2.circle(bgr, center, int(rng.integers(20, height // 6)), color, -1)
+        
+        for threshold, tolerance in ((240, 20), (230, 0), (250, -10)):
+            timings = {}
+            masks = {}
+            for name, func in (("reference", white_background_mask_reference), ("fused", white_background_mask)):
+                best = None
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    masks[name] = func(bgr, threshold, tolerance)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[name] = best
+            equal = np.array_equal(masks["reference"], masks["fused"])
+            all_equal = all_equal and equal
+            print(f"{label} threshold={threshold} tolerance={tolerance}: "
+                  f"reference {timings['reference'] * 1000:.1f} ms, fused {timings['fused'] * 1000:.1f} ms "
+                  f"({timings['reference'] / timings['fused']:.1f}x), identical: {equal}")
+    return all_equal
+
+def dark_area_mask(bgr, threshold=30):
+    """Closed 0/1 mask of dark pixels in a BGR image"""
+    # Convert to RGB
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    
+    # Detect dark areas
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    dark_mask = gray <= threshold
+    
+    # Clean up the mask
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+    return cv2.morphologyEx(dark_mask.astype(np.uint8), cv2.MORPH_CLOSE, kernel)
+
 class PNGBackgroundCleaner:
     def __init__(self):
         self.current_image = None
@@ -15,11 +124,12 @@ class PNGBackgroundCleaner:
         self.brush_size = 20
         self.mode = 'remove'  # 'remove' or 'keep'
         
-    def load_image(self, image_path):
-        """Load an image and prepare it for editing"""
+    def load_image(self, image_path, img=None):
+        """Load an image and prepare it for editing (img: an already decoded imread result)"""
         try:
             # Load image
-            img = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+            if img is None:
+                img = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
             
             if img is None:
                 print(f"Error: Could not load image {image_path}")
@@ -56,39 +166,7 @@ class PNGBackgroundCleaner:
         if self.current_image is None:
             return False
             
-        # Convert to RGB for processing
-        rgb = cv2.cvtColor(self.current_image[:,:,:3], cv2.COLOR_BGR2RGB)
-        
-        # Multiple methods to detect background
-        methods_masks = []
-        
-        # Method 1: Pure white detection
-        white_mask = np.all(rgb >= threshold, axis=2)
-        methods_masks.append(white_mask)
-        
-        # Method 2: Near-white with tolerance
-        near_white = np.all(rgb >= threshold - tolerance, axis=2)
-        methods_masks.append(near_white)
-        
-        # Method 3: Brightness-based
-        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
-        bright_mask = gray >= threshold
-        methods_masks.append(bright_mask)
-        
-        # Method 4: Color variance (low variance = likely background)
-        variance = np.var(rgb, axis=2)
-        low_variance_mask = variance < 100  # Low color variance
-        bright_and_uniform = bright_mask & low_variance_mask
-        methods_masks.append(bright_and_uniform)
-        
-        # Combine methods - pixel is background if multiple methods agree
-        background_mask = np.zeros_like(white_mask)
-        for mask in methods_masks:
-            background_mask = background_mask | mask
-            
-        # Clean up the mask
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-        background_mask = cv2.morphologyEx(background_mask.astype(np.uint8), cv2.MORPH_CLOSE, kernel)
+        background_mask = white_background_mask(self.current_image[:,:,:3], threshold, tolerance)
         
         # Apply flood fill from corners to get connected background
         h, w = background_mask.shape
@@ -111,16 +189,7 @@ class PNGBackgroundCleaner:
         if self.current_image is None:
             return False
             
-        # Convert to RGB
-        rgb = cv2.cvtColor(self.current_image[:,:,:3], cv2.COLOR_BGR2RGB)
-        
-        # Detect dark areas
-        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
-        dark_mask = gray <= threshold
-        
-        # Clean up the mask
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        dark_mask = cv2.morphologyEx(dark_mask.astype(np.uint8), cv2.MORPH_CLOSE, kernel)
+        dark_mask = dark_area_mask(self.current_image[:,:,:3], threshold)
         
         # Remove small dark spots
         contours, _ = cv2.findContours(dark_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -176,30 +245,27 @@ class PNGBackgroundCleaner:
         print(f"Filled {holes_filled} small holes")
         return True
     
-    def create_preview_with_checkerboard(self):
-        """Create a preview image with checkerboard background to show transparency"""
+    def create_preview_with_checkerboard(self, max_size=None):
+        """Create a preview image with checkerboard background to show transparency
+        
+        With max_size the preview is rendered at that many pixels on the long
+        side (display resolution) instead of at full size.
+        """
         if self.current_image is None:
             return None
             
         h, w = self.current_image.shape[:2]
-        checkerboard = np.zeros((h, w, 3), dtype=np.uint8)
-        
-        # Create checkerboard pattern
-        square_size = 20
-        for y in range(0, h, square_size):
-            for x in range(0, w, square_size):
-                color = [200, 200, 200] if ((y//square_size) + (x//square_size)) % 2 else [100, 100, 100]
-                checkerboard[y:y+square_size, x:x+square_size] = color
-        
-        # Blend with checkerboard
-        alpha = self.current_image[:, :, 3].astype(np.float32) / 255.0
-        alpha_3d = np.stack([alpha, alpha, alpha], axis=2)
-        
-        person_bgr = self.current_image[:, :, :3].astype(np.float32)
-        checkerboard = checkerboard.astype(np.float32)
-        
-        preview = alpha_3d * person_bgr + (1.0 - alpha_3d) * checkerboard
-        return preview.astype(np.uint8)
+        if not max_size or max(h, w) <= max_size:
+            return checkerboard_blend(self.current_image)
+        
+        # Downscale premultiplied color and alpha separately so the colors of
+        # transparent pixels do not bleed into the preview
+        scale = max_size / max(h, w)
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        alpha = self.current_image[:, :, 3:4].astype(np.uint16)
+        premultiplied = cv2.resize(self.current_image[:, :, :3] * alpha, size, interpolation=cv2.INTER_AREA)
+        alpha = cv2.resize(alpha, size, interpolation=cv2.INTER_AREA)[:, :, np.newaxis]
+        return composite_over_checkerboard(premultiplied, alpha)
     
     def save_image(self, output_path):
         """Save the cleaned image"""
@@ -214,8 +280,75 @@ class PNGBackgroundCleaner:
             print(f"Error saving image: {e}")
             return False
     
-    def process_batch(self, input_paths, output_dir, auto_settings=None):
-        """Process multiple images with the same settings"""
+    def apply_auto_settings(self, auto_settings):
+        """Run the automatic cleaning steps enabled in auto_settings on the loaded image"""
+        if auto_settings['remove_white']:
+            self.auto_remove_white_background(
+                auto_settings['white_threshold'],
+                auto_settings['white_tolerance']
+            )
+        
+        if auto_settings['remove_black']:
+            self.remove_black_areas(auto_settings['black_threshold'])
+        
+        if auto_settings['fill_holes']:
+            self.fill_holes(auto_settings['hole_size'])
+        
+        if auto_settings['clean_edges']:
+            self.clean_edges(auto_settings['edge_blur'])
+    
+    def clean_file(self, input_path, img, output_dir, auto_settings):
+        """Clean one decoded image and save it with its preview; returns a summary entry"""
+        entry = {'input': input_path, 'output': None, 'status': 'failed'}
+        print(f"\nProcessing: {input_path}")
+        
+        start = time.perf_counter()
+        if not self.load_image(input_path, img):
+            return entry
+        
+        # Apply automatic cleaning
+        self.apply_auto_settings(auto_settings)
+        entry['process_time'] = time.perf_counter() - start
+        
+        # Save result
+        start = time.perf_counter()
+        output_path = cleaned_output_path(input_path, output_dir)
+        if self.save_image(output_path):
+            entry['status'] = 'processed'
+            entry['output'] = output_path
+            
+            # Save preview
+            preview = self.create_preview_with_checkerboard(auto_settings.get('preview_size'))
+            if preview is not None:
+                base_name = os.path.splitext(os.path.basename(input_path))[0]
+                preview_path = os.path.join(output_dir, f"{base_name}_preview.png")
+                cv2.imwrite(preview_path, preview)
+        entry['save_time'] = time.perf_counter() - start
+        
+        return entry
+    
+    def clean_files(self, input_paths, output_dir, auto_settings):
+        """Clean files in order while a thread decodes the next one"""
+        entries = []
+        with ThreadPoolExecutor(max_workers=1) as decoder:
+            pending = decoder.submit(timed_imread, input_paths[0]) if input_paths else None
+            for i, input_path in enumerate(input_paths):
+                img, decode_time = pending.result()
+                if i + 1 < len(input_paths):
+                    pending = decoder.submit(timed_imread, input_paths[i + 1])
+                entry = self.clean_file(input_path, img, output_dir, auto_settings)
+                entry['decode_time'] = decode_time
+                entries.append(entry)
+        return entries
+    
+    def process_batch(self, input_paths, output_dir, auto_settings=None, workers=1, force=False):
+        """Process multiple images with the same settings
+        
+        With workers > 1 the files are spread over a process pool, each worker
+        holding its own cleaner. Files whose output is newer than the input
+        and was made with the same settings are skipped unless force is set.
+        A per-file timing summary is written to batch_summary.json.
+        """
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             
@@ -232,48 +365,411 @@ class PNGBackgroundCleaner:
                 'hole_size': 100
             }
         
-        results = []
+        start = time.perf_counter()
+        settings_hash = hashlib.sha256(json.dumps(auto_settings, sort_keys=True).encode()).hexdigest()[:16]
+        summary_path = os.path.join(output_dir, 'batch_summary.json')
+        previous_hashes = load_previous_settings_hashes(summary_path)
         
+        entries = []
+        todo = []
         for input_path in input_paths:
             if not os.path.exists(input_path):
                 print(f"File not found: {input_path}")
+                entries.append({'input': input_path, 'output': None, 'status': 'missing'})
                 continue
-                
-            print(f"\nProcessing: {input_path}")
             
-            if not self.load_image(input_path):
+            output_path = cleaned_output_path(input_path, output_dir)
+            if (not force and previous_hashes.get(output_path) == settings_hash and
+                    os.path.exists(output_path) and
+                    os.path.getmtime(output_path) >= os.path.getmtime(input_path)):
+                print(f"Up to date, skipping: {input_path}")
+                entries.append({'input': input_path, 'output': output_path, 'status': 'skipped'})
                 continue
+            todo.append(input_path)
+        
+        if workers > 1 and len(todo) > 1:
+            # Small chunks keep the pool balanced while still letting each worker prefetch
+            chunk_size = max(1, min(8, len(todo) // (workers * 4)))
+            chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+            with Pool(processes=workers, initializer=init_cleaner_worker) as pool:
+                for chunk_entries in pool.imap(clean_files_task, [(chunk, output_dir, auto_settings) for chunk in chunks]):
+                    entries.extend(chunk_entries)
+        else:
+            entries.extend(self.clean_files(todo, output_dir, auto_settings))
+        
+        # Report files in the order they were given
+        order = {input_path: i for i, input_path in enumerate(input_paths)}
+        entries.sort(key=lambda entry: order[entry['input']])
+        for entry in entries:
+            if entry['status'] in ('processed', 'skipped'):
+                entry['settings_hash'] = settings_hash
+            entry['total_time'] = entry.get('decode_time', 0) + entry.get('process_time', 0) + entry.get('save_time', 0)
+        
+        summary = {
+            'settings': auto_settings,
+            'settings_hash': settings_hash,
+            'workers': workers,
+            'processed': sum(1 for entry in entries if entry['status'] == 'processed'),
+            'skipped': sum(1 for entry in entries if entry['status'] == 'skipped'),
+            'failed': sum(1 for entry in entries if entry['status'] in ('failed', 'missing')),
+            'wall_time': time.perf_counter() - start,
+            'files': entries
+        }
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nBatch summary written to: {summary_path}")
+        
+        return [entry['output'] for entry in entries if entry['status'] == 'processed']
+
+def cleaned_output_path(input_path, output_dir):
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"{base_name}_cleaned.png")
+
+def timed_imread(path):
+    start = time.perf_counter()
+    img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    return img, time.perf_counter() - start
+
+def load_previous_settings_hashes(summary_path):
+    """Map output path -> settings hash from an earlier batch_summary.json"""
+    try:
+        with open(summary_path) as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {entry['output']: entry.get('settings_hash') for entry in summary.get('files', []) if entry.get('output')}
+
+# Per-process cleaner for the parallel batch mode
+WORKER_STATE = {}
+
+def init_cleaner_worker():
+    cv2.setNumThreads(1)  # The pool already uses every core
+    WORKER_STATE['cleaner'] = PNGBackgroundCleaner()
+
+def clean_files_task(args):
+    input_paths, output_dir, auto_settings = args
+    return WORKER_STATE['cleaner'].clean_files(input_paths, output_dir, auto_settings)
+
+@lru_cache(maxsize=8)
+def checkerboard_pattern(height, width, square_size=20):
+    """Gray 100/200 checkerboard of one size, built once and shared read-only"""
+    ys = (np.arange(height) // square_size) % 2
+    xs = (np.arange(width) // square_size) % 2
+    pattern = np.where(ys[:, np.newaxis] != xs[np.newaxis, :], 200, 100).astype(np.uint8)
+    pattern.flags.writeable = False
+    return pattern
+
+def checkerboard_tile(height, width, y0=0, x0=0, square_size=20):
+    """The part of the image-wide checkerboard covering a tile at (y0, x0)"""
+    period = 2 * square_size
+    pattern = checkerboard_pattern(height + period, width + period, square_size)
+    oy, ox = y0 % period, x0 % period
+    return pattern[oy:oy + height, ox:ox + width]
+
+def composite_over_checkerboard(premultiplied, alpha, y0=0, x0=0, square_size=20):
+    """(premultiplied + checkerboard * (255 - alpha)) / 255 in 16-bit fixed point; both inputs uint16"""
+    h, w = alpha.shape[:2]
+    blended = premultiplied + (255 - alpha) * checkerboard_tile(h, w, y0, x0, square_size)[:, :, np.newaxis]
+    
+    # Rounded division by 255, exact for values up to 255 * 255
+    blended += 128
+    blended += blended >> 8
+    blended >>= 8
+    return blended.astype(np.uint8)
+
+def checkerboard_blend(bgra, y0=0, x0=0, square_size=20):
+    """Blend a BGRA image, or the tile of one at (y0, x0), over the transparency checkerboard"""
+    alpha = bgra[:, :, 3:4].astype(np.uint16)
+    return composite_over_checkerboard(bgra[:, :, :3] * alpha, alpha, y0, x0, square_size)
+
+def tile_ranges(height, width, tile_size):
+    """(y0, y1, x0, x1) for each tile, row-major"""
+    for y0 in range(0, height, tile_size):
+        for x0 in range(0, width, tile_size):
+            yield y0, min(y0 + tile_size, height), x0, min(x0 + tile_size, width)
+
+class StreamingComponents:
+    """Sizes of the 8-connected components of a mask that is only ever seen one tile at a time.
+    
+    The first pass labels each tile with cv2.connectedComponentsWithStats and
+    merges labels that touch across tile seams. Only components still on the
+    frontier (the bottom row of finished tiles and the right column of the
+    current tile) stay in the in-memory union-find; after every tile the other
+    labels go to a disk-backed link table, as a link to their root or, for a
+    finished component, as its negated pixel count. The second pass relabels
+    each tile and follows the links, so callers can select components by size.
+    """
+    def __init__(self, height, width, tile_size, path):
+        self.height = height
+        self.width = width
+        self.tile_size = tile_size
+        self.parent = {}
+        self.size = {}
+        
+        # A tile holds at most one 8-connected component per 2x2 block, which
+        # fixes every tile's label range before the scan
+        self.tile_bases = np.empty((-(-height // tile_size), -(-width // tile_size)), np.int64)
+        capacity = 0
+        for y0, y1, x0, x1 in tile_ranges(height, width, tile_size):
+            self.tile_bases[y0 // tile_size, x0 // tile_size] = capacity
+            capacity += ((y1 - y0 + 1) // 2) * ((x1 - x0 + 1) // 2)
+        dtype = np.int32 if max(capacity, height * width) <= np.iinfo(np.int32).max else np.int64
+        self.links = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(capacity,))
+    
+    def find(self, label):
+        parent = self.parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        while parent[label] != root:
+            parent[label], label = root, parent[label]
+        return root
+    
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+    
+    def union_pairs(self, labels_a, labels_b):
+        both = (labels_a >= 0) & (labels_b >= 0)
+        if not both.any():
+            return
+        pairs = np.unique(np.stack([labels_a[both], labels_b[both]], axis=1), axis=0)
+        for a, b in pairs:
+            self.union(int(a), int(b))
+    
+    def label_tile(self, mask, y0, x0):
+        """Local labels and stats of a tile mask and the global id of local label 1"""
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(mask.astype(np.uint8), connectivity=8)
+        return labels, stats, int(self.tile_bases[y0 // self.tile_size, x0 // self.tile_size]), count
+    
+    def compact(self, frontier):
+        """Rewrite the frontier label arrays to their roots and move every other label to the link table"""
+        live = set()
+        for labels in frontier:
+            alive = labels >= 0
+            if alive.any():
+                values, inverse = np.unique(labels[alive], return_inverse=True)
+                roots = np.array([self.find(int(value)) for value in values], np.int64)
+                labels[alive] = roots[inverse]
+                live.update(roots.tolist())
+        
+        indices, links = [], []
+        for label in self.parent:
+            root = self.find(label)
+            if label != root:
+                indices.append(label)
+                links.append(root)
+            elif root not in live:
+                indices.append(root)
+                links.append(-self.size[root])
+        if indices:
+            self.links[np.array(indices)] = links
+        self.parent = {root: root for root in live}
+        self.size = {root: self.size[root] for root in live}
+    
+    def scan(self, tile_mask):
+        """First pass: tile_mask(y0, y1, x0, x1) returns the boolean mask of one tile"""
+        previous_row = np.full(self.width, -1, np.int64)
+        current_row = np.full(self.width, -1, np.int64)
+        for y0, y1, x0, x1 in tile_ranges(self.height, self.width, self.tile_size):
+            if x0 == 0 and y0 > 0:
+                previous_row, current_row = current_row, previous_row
+                current_row.fill(-1)
+            labels, stats, base, count = self.label_tile(tile_mask(y0, y1, x0, x1), y0, x0)
+            ids = range(base, base + count - 1)
+            self.parent.update(zip(ids, ids))
+            self.size.update(zip(ids, stats[1:, cv2.CC_STAT_AREA].tolist()))
+            global_labels = np.where(labels > 0, labels.astype(np.int64) + base - 1, -1)
+            
+            # Seam with the tile row above, including both diagonals
+            if y0 > 0:
+                top = global_labels[0]
+                for dx in (-1, 0, 1):
+                    lo, hi = max(x0 + dx, 0), min(x1 + dx, self.width)
+                    self.union_pairs(top[lo - x0 - dx:hi - x0 - dx], previous_row[lo:hi])
+            
+            # Seam with the tile to the left
+            if x0 > 0:
+                left = global_labels[:, 0]
+                for dy in (-1, 0, 1):
+                    lo, hi = max(dy, 0), min(len(left) + dy, len(left))
+                    self.union_pairs(left[lo - dy:hi - dy], left_column[lo:hi])
+            
+            left_column = global_labels[:, -1].copy()
+            current_row[x0:x1] = global_labels[-1]
+            if x1 < self.width:
+                # The next tile still seams with the row above from x1 - 1 on
+                self.compact([previous_row[x1 - 1:], current_row[:x1], left_column])
+            else:
+                self.compact([current_row])
+        self.compact([])
+    
+    def select(self, tile_mask, y0, y1, x0, x1, predicate):
+        """Second pass: mask of the tile's pixels whose component satisfies predicate(sizes)"""
+        labels, _, base, count = self.label_tile(tile_mask(y0, y1, x0, x1), y0, x0)
+        links = np.array(self.links[base:base + count - 1], np.int64)
+        pending = links >= 0
+        while pending.any():
+            links[pending] = self.links[links[pending]]
+            pending = links >= 0
+        chosen = np.zeros(count, bool)
+        chosen[1:] = predicate(-links)
+        return chosen[labels]
+
+def write_png_bands(path, height, width, bands):
+    """Write an 8-bit PNG from full-width BGR or BGRA row bands, one band in memory at a time"""
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+    
+    compressor = zlib.compressobj()
+    with open(path, 'wb') as f:
+        header_written = False
+        for band in bands:
+            channels = band.shape[2]
+            if not header_written:
+                color_type = 6 if channels == 4 else 2
+                f.write(b'\x89PNG\r\n\x1a\n')
+                f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)))
+                header_written = True
+            
+            # RGB(A) rows with the Sub filter (type 1); uint8 differences wrap as PNG expects
+            rows = band[:, :, [2, 1, 0, 3][:channels]].reshape(len(band), -1)
+            filtered = np.empty((len(band), rows.shape[1] + 1), np.uint8)
+            filtered[:, 0] = 1
+            filtered[:, 1:channels + 1] = rows[:, :channels]
+            filtered[:, channels + 1:] = rows[:, channels:] - rows[:, :-channels]
+            data = compressor.compress(filtered.tobytes())
+            if data:
+                f.write(chunk(b'IDAT', data))
+        f.write(chunk(b'IDAT', compressor.flush()))
+        f.write(chunk(b'IEND', b''))
+
+class TiledBackgroundCleaner:
+    """Memory-bounded version of the batch cleaning pipeline for huge images.
+    
+    Input is a .npy array read memory-mapped; the working image, alpha plane
+    and component link table live in disk-backed memmaps and every stage runs
+    tile by tile with enough halo for its filters. Peak memory is a few
+    tile_size x tile_size tiles, O(width) seam labels and the union-find
+    entries of one tile plus the components still open on the frontier; the
+    PNG output and preview are encoded in bands of about one tile's pixels.
+    Small dark spots and holes are judged by pixel count rather than contour
+    area; a hole is any transparent component under the size limit, border
+    touching or not, as with the in-memory contour fill. The corner flood
+    fill is skipped because it never changes the alpha (every background
+    pixel becomes transparent either way).
+    """
+    def __init__(self, tile_size=2048, work_dir=None):
+        self.tile_size = tile_size
+        self.work_dir = work_dir
+    
+    def load_into_memmap(self, input_path, path):
+        """Copy a .npy input, read memory-mapped, into a BGRA memmap"""
+        if not input_path.endswith('.npy'):
+            print(f"Error: tiled mode reads .npy arrays (HxWx3 or HxWx4 uint8), not {input_path}")
+            return None
+        img = np.load(input_path, mmap_mode='r')
+        if img.ndim != 3 or img.shape[2] not in (3, 4) or img.dtype != np.uint8:
+            print(f"Error: Could not load image {input_path}")
+            return None
+        
+        height, width = img.shape[:2]
+        image = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=(height, width, 4))
+        for y0, y1, x0, x1 in tile_ranges(height, width, self.tile_size):
+            image[y0:y1, x0:x1, :img.shape[2]] = img[y0:y1, x0:x1]
+            if img.shape[2] == 3:
+                image[y0:y1, x0:x1, 3] = 255
+        return image
+    
+    def with_halo(self, y0, y1, x0, x1, halo, height, width):
+        """Tile bounds grown by halo (clipped to the image) and the tile's offset inside them"""
+        ys, xs = max(0, y0 - halo), max(0, x0 - halo)
+        ye, xe = min(height, y1 + halo), min(width, x1 + halo)
+        return (ys, ye, xs, xe), (y0 - ys, x0 - xs)
+    
+    def process(self, input_path, output_path, auto_settings, preview_path=None):
+        with tempfile.TemporaryDirectory(dir=self.work_dir) as work_dir:
+            image = self.load_into_memmap(input_path, os.path.join(work_dir, 'image.npy'))
+            if image is None:
+                return False
+            height, width = image.shape[:2]
+            print(f"Tiled processing: {width}x{height} in {self.tile_size}px tiles")
+            
+            alpha = np.lib.format.open_memmap(os.path.join(work_dir, 'alpha.npy'), mode='w+',
+                                              dtype=np.uint8, shape=(height, width))
+            tiles = list(tile_ranges(height, width, self.tile_size))
             
-            # Apply automatic cleaning
-            if auto_settings['remove_white']:
-                self.auto_remove_white_background(
-                    auto_settings['white_threshold'],
-                    auto_settings['white_tolerance']
-                )
+            def tile_of(mask_fn, halo):
+                # Build a mask on the tile plus halo and crop it back to the tile
+                def tile_mask(y0, y1, x0, x1):
+                    (ys, ye, xs, xe), (oy, ox) = self.with_halo(y0, y1, x0, x1, halo, height, width)
+                    mask = mask_fn(np.ascontiguousarray(image[ys:ye, xs:xe, :3]))
+                    return mask[oy:oy + y1 - y0, ox:ox + x1 - x0] > 0
+                return tile_mask
             
+            # White background (3x3 closing needs a 2px halo)
+            for y0, y1, x0, x1 in tiles:
+                if auto_settings['remove_white']:
+                    background = tile_of(lambda bgr: white_background_mask(
+                        bgr, auto_settings['white_threshold'], auto_settings['white_tolerance']), 2)(y0, y1, x0, x1)
+                    alpha[y0:y1, x0:x1] = np.where(background, 0, 255)
+                else:
+                    alpha[y0:y1, x0:x1] = image[y0:y1, x0:x1, 3]
+            
+            # Dark areas minus spots under 500 pixels (5x5 closing needs a 4px halo)
             if auto_settings['remove_black']:
-                self.remove_black_areas(auto_settings['black_threshold'])
+                dark_mask = tile_of(lambda bgr: dark_area_mask(bgr, auto_settings['black_threshold']), 4)
+                components = StreamingComponents(height, width, self.tile_size,
+                                                 os.path.join(work_dir, 'links.npy'))
+                components.scan(dark_mask)
+                for y0, y1, x0, x1 in tiles:
+                    dark = components.select(dark_mask, y0, y1, x0, x1, lambda sizes: sizes >= 500)
+                    alpha[y0:y1, x0:x1][dark] = 0
+                del components
+                print(f"Removed dark areas (threshold: {auto_settings['black_threshold']})")
             
+            # Small transparent holes, by pixel count
             if auto_settings['fill_holes']:
-                self.fill_holes(auto_settings['hole_size'])
+                hole_size = auto_settings['hole_size']
+                transparent = lambda y0, y1, x0, x1: alpha[y0:y1, x0:x1] <= 127
+                components = StreamingComponents(height, width, self.tile_size,
+                                                 os.path.join(work_dir, 'hole_links.npy'))
+                components.scan(transparent)
+                holes_filled = 0
+                for y0, y1, x0, x1 in tiles:
+                    holes = components.select(transparent, y0, y1, x0, x1, lambda sizes: sizes < hole_size)
+                    alpha[y0:y1, x0:x1][holes] = 255
+                    holes_filled += int(holes.sum())
+                del components
+                print(f"Filled {holes_filled} pixels of small holes")
             
-            if auto_settings['clean_edges']:
-                self.clean_edges(auto_settings['edge_blur'])
+            # Edge blur reads alpha with a halo and writes the output alpha channel
+            blur_radius = auto_settings['edge_blur'] if auto_settings['clean_edges'] else 0
+            for y0, y1, x0, x1 in tiles:
+                if blur_radius:
+                    (ys, ye, xs, xe), (oy, ox) = self.with_halo(y0, y1, x0, x1, blur_radius, height, width)
+                    ksize = blur_radius * 2 + 1
+                    blurred = cv2.GaussianBlur(np.ascontiguousarray(alpha[ys:ye, xs:xe]), (ksize, ksize), blur_radius)
+                    image[y0:y1, x0:x1, 3] = blurred[oy:oy + y1 - y0, ox:ox + x1 - x0]
+                else:
+                    image[y0:y1, x0:x1, 3] = alpha[y0:y1, x0:x1]
             
-            # Save result
-            base_name = os.path.splitext(os.path.basename(input_path))[0]
-            output_path = os.path.join(output_dir, f"{base_name}_cleaned.png")
+            # Full-width bands of about one tile's pixels for the PNG encoders
+            band = max(1, self.tile_size * self.tile_size // width)
+            starts = range(0, height, band)
+            write_png_bands(output_path, height, width, (image[y0:y0 + band] for y0 in starts))
+            print(f"Saved cleaned image to: {output_path}")
             
-            if self.save_image(output_path):
-                results.append(output_path)
-                
-                # Save preview
-                preview = self.create_preview_with_checkerboard()
-                if preview is not None:
-                    preview_path = os.path.join(output_dir, f"{base_name}_preview.png")
-                    cv2.imwrite(preview_path, preview)
-        
-        return results
+            if preview_path:
+                write_png_bands(preview_path, height, width,
+                                (checkerboard_blend(image[y0:y0 + band], y0) for y0 in starts))
+            del image, alpha
+        return True
 
 def interactive_mode():
     """Interactive mode for single image processing"""
@@ -332,7 +828,7 @@ def interactive_mode():
                 cleaner.clean_edges(blur_radius)
         
         elif choice == '5':
-            preview = cleaner.create_preview_with_checkerboard()
+            preview = cleaner.create_preview_with_checkerboard(max_size=1200)
             if preview is not None:
                 cv2.imshow("Preview (checkerboard shows transparency)", preview)
                 print("Press any key to close preview...")
@@ -373,9 +869,26 @@ def main():
     parser.add_argument('--no-black', action='store_true', help='Skip black area removal')
     parser.add_argument('--no-holes', action='store_true', help='Skip hole filling')
     parser.add_argument('--no-edges', action='store_true', help='Skip edge cleaning')
+    parser.add_argument('--preview-size', type=int, default=0,
+                        help='Render previews at most this many pixels on the long side (0 = full size)')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Worker processes for batch mode')
+    parser.add_argument('--force', action='store_true', help='Reprocess files even if their output is up to date')
+    parser.add_argument('--benchmark-mask', action='store_true',
+                        help='Benchmark the fused white-background mask against the reference on 4K/8K inputs')
+    parser.add_argument('--tile-size', type=int, default=0,
+                        help='Process huge images tile by tile with this tile size; peak memory is a few '
+                             'tiles plus O(width) seam state, everything else stays in disk-backed memmaps. '
+                             'Inputs must be .npy arrays (HxWx3 or HxWx4 uint8, e.g. from numpy.save): '
+                             'PNG/TIFF cannot be decoded band by band, so convert them first')
     
     args = parser.parse_args()
     
+    if args.benchmark_mask:
+        if not benchmark_white_background_mask():
+            print("ERROR: fused mask differs from the reference")
+            os.sys.exit(1)
+        return
+    
     if args.interactive or (not args.images and len(os.sys.argv) == 1):
         interactive_mode()
         return
@@ -396,13 +909,27 @@ def main():
         'clean_edges': not args.no_edges,
         'edge_blur': 2,
         'fill_holes': not args.no_holes,
-        'hole_size': 100
+        'hole_size': 100,
+        'preview_size': args.preview_size
     }
     
     print("PNG Background Cleaner - Batch Mode")
     print("="*40)
     
-    results = cleaner.process_batch(args.images, args.output, auto_settings)
+    if args.tile_size:
+        tiled_cleaner = TiledBackgroundCleaner(args.tile_size)
+        if not os.path.exists(args.output):
+            os.makedirs(args.output)
+        results = []
+        for input_path in args.images:
+            print(f"\nProcessing: {input_path}")
+            base_name = os.path.splitext(os.path.basename(input_path))[0]
+            output_path = os.path.join(args.output, f"{base_name}_cleaned.png")
+            preview_path = os.path.join(args.output, f"{base_name}_preview.png")
+            if tiled_cleaner.process(input_path, output_path, auto_settings, preview_path):
+                results.append(output_path)
+    else:
+        results = cleaner.process_batch(args.images, args.output, auto_settings, args.workers, args.force)
     
     print(f"\nProcessed {len(results)} images successfully")
     print(f"Cleaned images saved to: {args.output}/")
@@ -1,16 +1,317 @@
-import tkinter as tk
-from tkinter import messagebox
 import random
+import argparse
+import time
+import sys
+from multiprocessing import Pool
+
+try:
+    import tkinter as tk
+    from tkinter import messagebox
+except ImportError:
+    # Only the game window uses Tk; the solver and --selfplay do not
+    tk = None
+
+# Perfect-play solver, computed once at import.
+# Boards are flattened to 9-tuples of "", "X", "O" and X always moves first.
+WIN_LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
+             (0, 3, 6), (1, 4, 7), (2, 5, 8),
+             (0, 4, 8), (2, 4, 6)]
+
+def build_symmetries():
+    """The 8 board symmetries as index permutations: transformed[i] = state[perm[i]]"""
+    symmetries = []
+    for flip in (False, True):
+        for turns in range(4):
+            perm = []
+            for i in range(9):
+                r, c = divmod(i, 3)
+                if flip:
+                    c = 2 - c
+                for _ in range(turns):
+                    r, c = c, 2 - r
+                perm.append(r * 3 + c)
+            symmetries.append(tuple(perm))
+    return symmetries
+
+SYMMETRIES = build_symmetries()
+
+# Canonical state -> (value for the side to move, optimal squares in canonical coordinates)
+SOLVED_STATES = {}
+
+def line_winner(state):
+    for a, b, c in WIN_LINES:
+        if state[a] and state[a] == state[b] == state[c]:
+            return state[a]
+    return None
+
+def canonical_state(state):
+    """Smallest of the 8 symmetric images of state, and the permutation that produced it"""
+    best, best_perm = None, None
+    for perm in SYMMETRIES:
+        transformed = tuple(state[i] for i in perm)
+        if best is None or transformed < best:
+            best, best_perm = transformed, perm
+    return best, best_perm
+
+def solve_state(state):
+    """Memoized minimax over canonical states; faster wins score higher"""
+    if state in SOLVED_STATES:
+        return SOLVED_STATES[state][0]
+    
+    player = "X" if state.count("X") == state.count("O") else "O"
+    scores = {}
+    for i in range(9):
+        if state[i] != "":
+            continue
+        child = state[:i] + (player,) + state[i + 1:]
+        empty = child.count("")
+        if line_winner(child) == player:
+            scores[i] = 1 + empty
+        elif empty == 0:
+            scores[i] = 0
+        else:
+            scores[i] = -solve_state(canonical_state(child)[0])
+    
+    best = max(scores.values())
+    SOLVED_STATES[state] = (best, tuple(i for i, score in scores.items() if score == best))
+    return best
+
+def solver_cell(state):
+    """Optimal cell index for the side to move, or None if the position is not in the table"""
+    canonical, perm = canonical_state(state)
+    entry = SOLVED_STATES.get(canonical)
+    if entry is None:
+        return None
+    return perm[random.choice(entry[1])]
+
+def solver_move(board):
+    """Optimal (row, col) for the side to move on a 3x3 board, or None if the position is not in the table"""
+    cell = solver_cell(tuple(cell for row in board for cell in row))
+    return divmod(cell, 3) if cell is not None else None
+
+solve_state(("",) * 9)
+
+def bit_count(bits):
+    return bin(bits).count("1")
+
+def iter_cells(bits):
+    """Indices of the set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+class KInARowEngine:
+    """Bitmask engine for N×N boards won by k in a row.
+    
+    Cell (row, col) is bit row * size + col. Win lines are precomputed
+    masks, so a win test is a handful of AND/compare operations, and the
+    search is alpha-beta over the most threatening candidate cells.
+    """
+    WIN_SCORE = 10 ** 15
+    
+    def __init__(self, size=3, win_length=3, depth=None, max_candidates=10):
+        self.size = size
+        self.win_length = min(win_length, size)
+        self.cells = size * size
+        self.full_mask = (1 << self.cells) - 1
+        self.depth = depth or (self.cells if self.cells <= 9 else 3)
+        self.max_candidates = max_candidates
+        
+        # Every k-long row, column and diagonal segment, plus the lines through each cell
+        k = self.win_length
+        self.lines = []
+        for row in range(size):
+            for col in range(size):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row, end_col = row + dr * (k - 1), col + dc * (k - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        mask = 0
+                        for i in range(k):
+                            mask |= 1 << ((row + dr * i) * size + col + dc * i)
+                        self.lines.append(mask)
+        self.cell_lines = [[] for _ in range(self.cells)]
+        for mask in self.lines:
+            for cell in iter_cells(mask):
+                self.cell_lines[cell].append(mask)
+        
+        # Candidate moves are empty cells next to a stone
+        self.neighbours = []
+        for cell in range(self.cells):
+            row, col = divmod(cell, size)
+            mask = 0
+            for r in range(max(0, row - 1), min(size, row + 2)):
+                for c in range(max(0, col - 1), min(size, col + 2)):
+                    mask |= 1 << (r * size + c)
+            self.neighbours.append(mask)
+        
+        # Open lines holding n stones: completing our own beats blocking theirs
+        self.line_values = [4 ** n for n in range(k + 1)]
+        self.attack_weights = [4 ** n for n in range(k)]
+        self.block_weights = [3 ** n for n in range(k)]
+        self.attack_weights[k - 1] = 10 ** 12
+        self.block_weights[k - 1] = 10 ** 10
+    
+    def is_win(self, bits, cell):
+        """True if bits holds a full line through cell (the stone just placed)"""
+        for mask in self.cell_lines[cell]:
+            if bits & mask == mask:
+                return True
+        return False
+    
+    def has_win(self, bits):
+        for mask in self.lines:
+            if bits & mask == mask:
+                return True
+        return False
+    
+    def threat_score(self, own, other, cell):
+        score = 0
+        for mask in self.cell_lines[cell]:
+            mine = own & mask
+            theirs = other & mask
+            if not theirs:
+                score += self.attack_weights[bit_count(mine)]
+            elif not mine:
+                score += self.block_weights[bit_count(theirs)]
+        return score
+    
+    def ordered_moves(self, own, other):
+        """Candidate cells, most threatening (win, forced block, ...) first"""
+        occupied = own | other
+        if not occupied:
+            return [(self.size // 2) * self.size + self.size // 2]
+        
+        near = 0
+        for cell in iter_cells(occupied):
+            near |= self.neighbours[cell]
+        scored = [(self.threat_score(own, other, cell), cell)
+                  for cell in iter_cells(near & ~occupied & self.full_mask)]
+        scored.sort(reverse=True)
+        return [cell for _, cell in scored[:self.max_candidates]]
+    
+    def evaluate(self, own, other):
+        score = 0
+        for mask in self.lines:
+            mine = own & mask
+            theirs = other & mask
+            if not theirs:
+                score += self.line_values[bit_count(mine)]
+            elif not mine:
+                score -= self.line_values[bit_count(theirs)]
+        return score
+    
+    def negamax(self, own, other, depth, alpha, beta):
+        if (own | other) == self.full_mask:
+            return 0
+        if depth == 0:
+            return self.evaluate(own, other)
+        
+        for cell in self.ordered_moves(own, other):
+            placed = own | (1 << cell)
+            if self.is_win(placed, cell):
+                # Quicker wins score higher
+                return self.WIN_SCORE + depth
+            score = -self.negamax(other, placed, depth - 1, -beta, -alpha)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+    
+    def best_move(self, own, other):
+        """Best cell for the player holding own, or None on a full board"""
+        best_cell = None
+        alpha, beta = -self.WIN_SCORE * 10, self.WIN_SCORE * 10
+        for cell in self.ordered_moves(own, other):
+            placed = own | (1 << cell)
+            if self.is_win(placed, cell):
+                return cell
+            score = -self.negamax(other, placed, self.depth - 1, -beta, -alpha)
+            if best_cell is None or score > alpha:
+                alpha, best_cell = score, cell
+        return best_cell
+
+# Computer strategies for headless play. Each takes the engine and the
+# bitboards of the player to move (own) and its opponent, and returns a cell.
+def random_move(engine, own, other):
+    occupied = own | other
+    empty = [cell for cell in range(engine.cells) if not occupied >> cell & 1]
+    return random.choice(empty) if empty else None
+
+def heuristic_move(engine, own, other):
+    # Strategy: 1) Win if possible, 2) Block opponent from winning, 3) Take center, 4) Take corner, 5) Take any
+    occupied = own | other
+    empty = [cell for cell in range(engine.cells) if not occupied >> cell & 1]
+    
+    # 1. Check if we can win
+    for cell in empty:
+        if engine.is_win(own | (1 << cell), cell):
+            return cell
+            
+    # 2. Check if need to block opponent from winning
+    for cell in empty:
+        if engine.is_win(other | (1 << cell), cell):
+            return cell
+            
+    # 3. Take center if available
+    center = (engine.size // 2) * engine.size + engine.size // 2
+    if not occupied >> center & 1:
+        return center
+        
+    # 4. Take a corner if available
+    last = engine.size - 1
+    corners = [0, last, last * engine.size, engine.cells - 1]
+    available_corners = [corner for corner in corners if not occupied >> corner & 1]
+    if available_corners:
+        return random.choice(available_corners)
+        
+    # 5. Take any available spot
+    return empty[0] if empty else None
+
+# (own bits, other bits) -> optimal cells, filled lazily from SOLVED_STATES
+PERFECT_CELLS = {}
+
+def perfect_move(engine, own, other):
+    # The solved table is 3x3 only; other boards fall back to the search
+    if engine.size != 3 or engine.win_length != 3:
+        return engine.best_move(own, other)
+    cells = PERFECT_CELLS.get((own, other))
+    if cells is None:
+        # First visit: translate the bitboards and map the canonical optimal squares back
+        mover, waiting = ("X", "O") if bit_count(own) == bit_count(other) else ("O", "X")
+        state = tuple(mover if own >> i & 1 else waiting if other >> i & 1 else "" for i in range(9))
+        canonical, perm = canonical_state(state)
+        entry = SOLVED_STATES.get(canonical)
+        cells = tuple(perm[i] for i in entry[1]) if entry else ()
+        PERFECT_CELLS[(own, other)] = cells
+    return random.choice(cells) if cells else heuristic_move(engine, own, other)
+
+def engine_move(engine, own, other):
+    return engine.best_move(own, other)
+
+STRATEGIES = {
+    'random': random_move,
+    'heuristic': heuristic_move,
+    'perfect': perfect_move,
+    'engine': engine_move
+}
 
 class TicTacToeGame:
-    def __init__(self):
+    def __init__(self, size=3, win_length=3):
+        self.size = size
+        self.win_length = min(win_length, size)
+        self.engine = KInARowEngine(size, self.win_length)
+        
         self.window = tk.Tk()
-        self.window.title("Tic-Tac-Toe")
-        self.window.geometry("400x500")
+        self.window.title("Tic-Tac-Toe" if size == 3 else f"{self.win_length} in a Row ({size}x{size})")
+        if size == 3:
+            self.window.geometry("400x500")
         self.window.resizable(False, False)
         
         # Game state
-        self.board = [["" for _ in range(3)] for _ in range(3)]
+        self.board = [["" for _ in range(size)] for _ in range(size)]
+        self.bits = {"X": 0, "O": 0}
         self.current_player = "X"  # Human is X, Computer is O
         self.game_over = False
         
@@ -32,13 +333,14 @@ class TicTacToeGame:
         self.board_frame = tk.Frame(self.window, bg="black")
         self.board_frame.pack(pady=20)
         
-        # Create 3x3 grid of buttons
+        # Create the grid of buttons
+        font_size = 20 if self.size <= 5 else 10
         self.buttons = []
-        for i in range(3):
+        for i in range(self.size):
             button_row = []
-            for j in range(3):
-                btn = tk.Button(self.board_frame, text="", font=("Arial", 20, "bold"),
-                               width=3, height=1, bg="lightgray",
+            for j in range(self.size):
+                btn = tk.Button(self.board_frame, text="", font=("Arial", font_size, "bold"),
+                               width=3 if self.size <= 5 else 2, height=1, bg="lightgray",
                                command=lambda r=i, c=j: self.make_move(r, c))
                 btn.grid(row=i, column=j, padx=2, pady=2)
                 button_row.append(btn)
@@ -61,7 +363,7 @@ class TicTacToeGame:
             return
             
         # Human move
-        self.board[row][col] = "X"
+        self.place(row, col, "X")
         self.buttons[row][col].config(text="X", fg="blue", state="disabled")
         
         # Check if human won
@@ -90,7 +392,7 @@ class TicTacToeGame:
         move = self.get_best_move()
         if move:
             row, col = move
-            self.board[row][col] = "O"
+            self.place(row, col, "O")
             self.buttons[row][col].config(text="O", fg="red", state="disabled")
             
             # Check if computer won
@@ -108,82 +410,45 @@ class TicTacToeGame:
                 
         self.status_label.config(text="Your turn! Click a square to place X", fg="green")
         
+    def place(self, row, col, player):
+        self.board[row][col] = player
+        self.bits[player] |= 1 << (row * self.size + col)
+        
     def get_best_move(self):
-        # Strategy: 1) Win if possible, 2) Block human from winning, 3) Take center, 4) Take corner, 5) Take any
-        
-        # 1. Check if computer can win
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == "":
-                    self.board[i][j] = "O"
-                    if self.check_winner("O"):
-                        self.board[i][j] = ""  # Reset
-                        return (i, j)
-                    self.board[i][j] = ""  # Reset
-                    
-        # 2. Check if need to block human from winning
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == "":
-                    self.board[i][j] = "X"
-                    if self.check_winner("X"):
-                        self.board[i][j] = ""  # Reset
-                        return (i, j)
-                    self.board[i][j] = ""  # Reset
-                    
-        # 3. Take center if available
-        if self.board[1][1] == "":
-            return (1, 1)
+        if self.size != 3 or self.win_length != 3:
+            cell = self.engine.best_move(self.bits["O"], self.bits["X"])
+            return divmod(cell, self.size) if cell is not None else None
             
-        # 4. Take a corner if available
-        corners = [(0, 0), (0, 2), (2, 0), (2, 2)]
-        available_corners = [corner for corner in corners if self.board[corner[0]][corner[1]] == ""]
-        if available_corners:
-            return random.choice(available_corners)
-            
-        # 5. Take any available spot
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == "":
-                    return (i, j)
-                    
-        return None
+        # Table lookup in the solved game; the heuristic only covers positions outside it
+        move = solver_move(self.board)
+        if move is not None:
+            return move
+        return self.get_heuristic_move()
+        
+    def get_heuristic_move(self):
+        cell = heuristic_move(self.engine, self.bits["O"], self.bits["X"])
+        return divmod(cell, self.size) if cell is not None else None
         
     def check_winner(self, player):
-        # Check rows
-        for i in range(3):
-            if all(self.board[i][j] == player for j in range(3)):
-                return True
-                
-        # Check columns
-        for j in range(3):
-            if all(self.board[i][j] == player for i in range(3)):
-                return True
-                
-        # Check diagonals
-        if all(self.board[i][i] == player for i in range(3)):
-            return True
-        if all(self.board[i][2-i] == player for i in range(3)):
-            return True
-            
-        return False
+        return self.engine.has_win(self.bits[player])
         
     def is_board_full(self):
-        return all(self.board[i][j] != "" for i in range(3) for j in range(3))
+        return (self.bits["X"] | self.bits["O"]) == self.engine.full_mask
         
     def disable_all_buttons(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.size):
+            for j in range(self.size):
                 self.buttons[i][j].config(state="disabled")
                 
     def new_game(self):
         # Reset game state
-        self.board = [["" for _ in range(3)] for _ in range(3)]
+        self.board = [["" for _ in range(self.size)] for _ in range(self.size)]
+        self.bits = {"X": 0, "O": 0}
         self.game_over = False
         
         # Reset UI
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.size):
+            for j in range(self.size):
                 self.buttons[i][j].config(text="", fg="black", state="normal", bg="lightgray")
                 
         self.status_label.config(text="Your turn! Click a square to place X", fg="green")
@@ -191,8 +456,84 @@ class TicTacToeGame:
     def run(self):
         self.window.mainloop()
 
-# Create and run the game
-if __name__ == "__main__":
-    game = TicTacToeGame()
+def play_games(job):
+    """Play a chunk of headless games; runs in a worker process"""
+    x_name, o_name, games, seed, size, win_length = job
+    random.seed(seed)
+    engine = KInARowEngine(size, win_length)
+    strategies = (STRATEGIES[x_name], STRATEGIES[o_name])
+    results = {"X": 0, "O": 0, "draw": 0, "moves": 0}
+    
+    for _ in range(games):
+        bits = [0, 0]
+        player = 0
+        outcome = "draw"
+        while (bits[0] | bits[1]) != engine.full_mask:
+            cell = strategies[player](engine, bits[player], bits[1 - player])
+            bits[player] |= 1 << cell
+            results["moves"] += 1
+            if engine.is_win(bits[player], cell):
+                outcome = "XO"[player]
+                break
+            player = 1 - player
+        results[outcome] += 1
+    return results
+
+def run_selfplay(x_name, o_name, games, workers=None, size=3, win_length=3, seed=0, chunk_size=10000):
+    """Play games between two strategies over a process pool and return outcome counts and timing"""
+    jobs = []
+    for start in range(0, games, chunk_size):
+        jobs.append((x_name, o_name, min(chunk_size, games - start), seed + start, size, win_length))
+    
+    totals = {"X": 0, "O": 0, "draw": 0, "moves": 0}
+    start_time = time.perf_counter()
+    with Pool(processes=workers) as pool:
+        for results in pool.imap_unordered(play_games, jobs):
+            for key, value in results.items():
+                totals[key] += value
+    totals["games"] = games
+    totals["seconds"] = time.perf_counter() - start_time
+    return totals
+
+def print_selfplay_report(x_name, o_name, totals):
+    games = totals["games"] or 1
+    print(f"{x_name} (X) vs {o_name} (O): {totals['games']} games in {totals['seconds']:.2f}s "
+          f"({totals['games'] / totals['seconds']:.0f} games/s, {totals['moves'] / games:.2f} moves/game)")
+    for outcome, label in (("X", f"X wins ({x_name})"), ("O", f"O wins ({o_name})"), ("draw", "Draws")):
+        print(f"  {label}: {totals[outcome]} ({100 * totals[outcome] / games:.2f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Tic-tac-toe and larger k-in-a-row games against the computer')
+    parser.add_argument('--size', type=int, default=3, help='Board size N for an NxN board')
+    parser.add_argument('--win', type=int, default=3, help='Stones in a row needed to win')
+    parser.add_argument('--selfplay', type=int, metavar='GAMES', help='Play GAMES headless games between --x and --o and exit')
+    parser.add_argument('--x', default='random', choices=sorted(STRATEGIES), help='Strategy for X (moves first)')
+    parser.add_argument('--o', default='perfect', choices=sorted(STRATEGIES), help='Strategy for O')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0, help='Base random seed')
+    args = parser.parse_args()
+    if args.selfplay is not None and args.selfplay < 1:
+        parser.error("--selfplay needs at least 1 game")
+    
+    if args.selfplay is not None:
+        totals = run_selfplay(args.x, args.o, args.selfplay, args.workers, args.size, args.win, args.seed)
+        print_selfplay_report(args.x, args.o, totals)
+        
+        # A perfect player must never lose on the solved 3x3 board
+        if args.size == 3 and args.win == 3 and ((args.x == 'perfect' and totals["O"]) or
+                                                 (args.o == 'perfect' and totals["X"])):
+            print("ERROR: the perfect solver lost games")
+            sys.exit(1)
+        return
+    
+    if tk is None:
+        print("Tkinter is not available; use --selfplay for headless play")
+        sys.exit(1)
+    
+    # Create and run the game
+    game = TicTacToeGame(args.size, args.win)
     game.run()
 
+if __name__ == "__main__":
+    main()
+
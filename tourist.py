@@ -5,9 +5,120 @@ from PIL import Image, ImageEnhance, ImageFilter
 import matplotlib.pyplot as plt
 from io import BytesIO
 import os
+import time
+import json
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+
+def mask_iou(mask_a, mask_b):
+    """Intersection over union of two 0/255 masks"""
+    a = mask_a > 0
+    b = mask_b > 0
+    union = np.logical_or(a, b).sum()
+    return np.logical_and(a, b).sum() / union if union else 1.0
+
+# Haar face detector, loaded once per process by get_face_cascade()
+FACE_CASCADE = None
+
+def get_face_cascade():
+    global FACE_CASCADE
+    if FACE_CASCADE is None:
+        FACE_CASCADE = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    return FACE_CASCADE
+
+class ImageFeatures:
+    """Color space conversions and face detections shared by the mask methods for one image"""
+    def __init__(self, image):
+        self.hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
+        self.ycrcb = cv2.cvtColor(image, cv2.COLOR_RGB2YCrCb)
+        self.lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
+        self.gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        self.faces = get_face_cascade().detectMultiScale(self.gray, 1.1, 4, minSize=(30, 30))
+
+class BackgroundCache:
+    """On-disk cache of downloaded backgrounds, already resized, keyed by URL and size.
+    
+    Each entry is a .npy array (loaded memory-mapped) plus a .json file with
+    the ETag/Last-Modified validators used for conditional revalidation.
+    """
+    def __init__(self, cache_dir="background_cache", offline=False):
+        self.cache_dir = cache_dir
+        self.offline = offline
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def entry_paths(self, url, size):
+        key = hashlib.sha256(f"{url}|{size[0]}x{size[1]}".encode()).hexdigest()[:32]
+        base = os.path.join(self.cache_dir, key)
+        return base + ".npy", base + ".json"
+    
+    def fetch(self, url, size, headers=None):
+        """Return the background resized to size, from cache when it is still valid"""
+        array_path, meta_path = self.entry_paths(url, size)
+        meta = None
+        if os.path.exists(array_path) and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        
+        if meta and self.offline:
+            return np.load(array_path, mmap_mode='r')
+        
+        request_headers = dict(headers or {})
+        if meta:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+        
+        try:
+            response = requests.get(url, headers=request_headers, timeout=15)
+            if response.status_code == 304 and meta:
+                return np.load(array_path, mmap_mode='r')
+            response.raise_for_status()
+            img = np.array(Image.open(BytesIO(response.content)))
+        except Exception as e:
+            if meta:
+                print(f"    Offline or fetch failed ({e}), using cached copy")
+                return np.load(array_path, mmap_mode='r')
+            print(f"Error downloading from {url}: {e}")
+            return None
+        
+        background = cv2.resize(img, size)
+        
+        # Write to temporary names and rename so readers never see half an entry
+        tmp_array_path = array_path + ".tmp.npy"
+        np.save(tmp_array_path, background)
+        os.replace(tmp_array_path, array_path)
+        tmp_meta_path = meta_path + ".tmp"
+        with open(tmp_meta_path, 'w') as f:
+            json.dump({
+                'url': url,
+                'size': list(size),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }, f)
+        os.replace(tmp_meta_path, meta_path)
+        
+        return background
 
 class TouristPhotoComposer:
-    def __init__(self):
+    def __init__(self, mask_scale=1.0, background_cache=None):
+        # Resolution used for GrabCut and k-means: 1.0 segments at full size,
+        # smaller values segment a downscaled copy and refine near the boundary
+        self.mask_scale = mask_scale
+        
+        # Optional BackgroundCache; without one every run downloads every site
+        self.background_cache = background_cache
+        
+        # Seconds spent in each masking stage, summed over images
+        self.stage_timings = {}
+        
+        self.request_headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        
         # Use Wikimedia Commons and other free sources for tourist sites
         self.tourist_sites = [
             "https://upload.wikimedia.org/wikipedia/commons/thumb/8/85/Tour_Eiffel_Wikimedia_Commons_%28cropped%29.jpg/800px-Tour_Eiffel_Wikimedia_Commons_%28cropped%29.jpg",  # Eiffel Tower
@@ -33,10 +144,7 @@ class TouristPhotoComposer:
     def download_image(self, url):
         """Download image from URL with better error handling"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=15)
+            response = requests.get(url, headers=self.request_headers, timeout=15)
             response.raise_for_status()
             img = Image.open(BytesIO(response.content))
             return np.array(img)
@@ -62,33 +170,59 @@ class TouristPhotoComposer:
                 print(f"Error loading image {path}: {e}")
         return images, valid_paths
     
-    def create_advanced_person_mask(self, image):
-        """Advanced person extraction using multiple techniques"""
-        height, width = image.shape[:2]
+    def create_advanced_person_mask(self, image, timings=None):
+        """Advanced person extraction using multiple techniques
+        
+        Stage times are added to timings, or to self.stage_timings if not given.
+        """
+        if timings is None:
+            timings = self.stage_timings
+        
+        def timed(stage, method, *args):
+            start = time.perf_counter()
+            result = method(*args)
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+            return result
+        
+        # Color conversions and face detection, shared by the methods below
+        features = timed('features', ImageFeatures, image)
         
         # Method 1: Advanced skin detection
-        mask_skin = self.detect_skin_advanced(image)
+        mask_skin = timed('skin', self.detect_skin_advanced, image, features)
         
         # Method 2: GrabCut with multiple initializations
-        mask_grabcut = self.grabcut_multi_init(image)
+        mask_grabcut = timed('grabcut', self.grabcut_multi_init, image, features)
         
         # Method 3: Edge-based segmentation
-        mask_edges = self.edge_based_segmentation(image)
+        mask_edges = timed('edges', self.edge_based_segmentation, image, features)
         
         # Method 4: Color-based clustering
-        mask_cluster = self.color_clustering_mask(image)
+        mask_cluster = timed('kmeans', self.color_clustering_mask, image)
         
         # Combine masks intelligently
-        final_mask = self.combine_masks_smart([mask_skin, mask_grabcut, mask_edges, mask_cluster], image)
+        final_mask = timed('combine', self.combine_masks_smart, [mask_skin, mask_grabcut, mask_edges, mask_cluster], image)
         
         return final_mask
     
-    def detect_skin_advanced(self, image):
+    def add_stage_timings(self, timings):
+        for stage, seconds in timings.items():
+            self.stage_timings[stage] = self.stage_timings.get(stage, 0.0) + seconds
+    
+    def print_stage_timings(self):
+        """Print where the masking time went, slowest stage first"""
+        total = sum(self.stage_timings.values())
+        if not total:
+            return
+        print("\n⏱️ Masking time by stage:")
+        for stage, seconds in sorted(self.stage_timings.items(), key=lambda item: -item[1]):
+            print(f"  {stage:9s} {seconds:7.2f}s  {100 * seconds / total:5.1f}%")
+        print(f"  {'total':9s} {total:7.2f}s")
+    
+    def detect_skin_advanced(self, image, features=None):
         """Advanced skin detection with multiple color spaces"""
-        # Convert to different color spaces
-        hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
-        ycrcb = cv2.cvtColor(image, cv2.COLOR_RGB2YCrCb)
-        lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
+        # Different color spaces
+        features = features or ImageFeatures(image)
+        hsv, ycrcb, lab = features.hsv, features.ycrcb, features.lab
         
         # HSV skin detection (multiple ranges)
         hsv_lower1 = np.array([0, 20, 70])
@@ -119,7 +253,7 @@ class TouristPhotoComposer:
         
         return skin_mask
     
-    def grabcut_multi_init(self, image):
+    def grabcut_multi_init(self, image, features=None):
         """GrabCut with multiple initialization strategies"""
         height, width = image.shape[:2]
         
@@ -131,9 +265,8 @@ class TouristPhotoComposer:
         rectangles.append((margin_w, margin_h, width-2*margin_w, height-2*margin_h))
         
         # Face detection guided rectangle
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        faces = face_cascade.detectMultiScale(gray, 1.1, 4, minSize=(30, 30))
+        features = features or ImageFeatures(image)
+        faces = features.faces
         
         if len(faces) > 0:
             # Use largest face
@@ -154,12 +287,7 @@ class TouristPhotoComposer:
         
         for rect in rectangles:
             try:
-                mask = np.zeros((height, width), np.uint8)
-                bgdModel = np.zeros((1, 65), np.float64)
-                fgdModel = np.zeros((1, 65), np.float64)
-                
-                cv2.grabCut(image, mask, rect, bgdModel, fgdModel, 5, cv2.GC_INIT_WITH_RECT)
-                mask2 = np.where((mask == 2) | (mask == 0), 0, 1).astype('uint8') * 255
+                mask2 = self.run_grabcut(image, rect)
                 
                 # Score based on reasonable coverage
                 coverage = np.sum(mask2 > 0) / (width * height)
@@ -180,9 +308,60 @@ class TouristPhotoComposer:
             
         return best_mask
     
-    def edge_based_segmentation(self, image):
+    def run_grabcut(self, image, rect):
+        """GrabCut initialised from rect; coarse-to-fine when mask_scale < 1"""
+        height, width = image.shape[:2]
+        bgdModel = np.zeros((1, 65), np.float64)
+        fgdModel = np.zeros((1, 65), np.float64)
+        
+        if self.mask_scale >= 1.0:
+            mask = np.zeros((height, width), np.uint8)
+            cv2.grabCut(image, mask, rect, bgdModel, fgdModel, 5, cv2.GC_INIT_WITH_RECT)
+            return np.where((mask == 2) | (mask == 0), 0, 1).astype('uint8') * 255
+        
+        # Coarse pass on a downscaled copy
+        scale = self.mask_scale
+        small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        x, y, w, h = rect
+        small_rect = (int(x * scale), int(y * scale), max(1, int(w * scale)), max(1, int(h * scale)))
+        small_mask = np.zeros(small.shape[:2], np.uint8)
+        cv2.grabCut(small, small_mask, small_rect, bgdModel, fgdModel, 5, cv2.GC_INIT_WITH_RECT)
+        coarse = np.where((small_mask == 2) | (small_mask == 0), 0, 255).astype(np.uint8)
+        coarse = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_LINEAR)
+        
+        # Pixels further than the band from the upsampled boundary are fixed,
+        # the band in between is re-segmented at full resolution
+        band = max(3, int(round(2 / scale)))
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * band + 1, 2 * band + 1))
+        foreground = coarse > 127
+        sure_foreground = cv2.erode(coarse, kernel) > 127
+        possible = cv2.dilate(coarse, kernel) > 127
+        
+        ys, xs = np.nonzero(possible)
+        if len(ys) == 0 or not sure_foreground.any():
+            return np.where(foreground, 255, 0).astype(np.uint8)
+        y0, y1 = max(0, ys.min() - band), min(height, ys.max() + band + 1)
+        x0, x1 = max(0, xs.min() - band), min(width, xs.max() + band + 1)
+        
+        mask = np.full((height, width), cv2.GC_BGD, np.uint8)
+        mask[possible] = cv2.GC_PR_BGD
+        mask[foreground] = cv2.GC_PR_FGD
+        mask[sure_foreground] = cv2.GC_FGD
+        roi_mask = np.ascontiguousarray(mask[y0:y1, x0:x1])
+        try:
+            cv2.grabCut(np.ascontiguousarray(image[y0:y1, x0:x1]), roi_mask, None,
+                        bgdModel, fgdModel, 2, cv2.GC_INIT_WITH_MASK)
+        except cv2.error:
+            # No background samples left inside the ROI; keep the coarse result
+            return np.where(foreground, 255, 0).astype(np.uint8)
+        
+        result = np.zeros((height, width), np.uint8)
+        result[y0:y1, x0:x1] = np.where((roi_mask == 2) | (roi_mask == 0), 0, 255)
+        return result
+    
+    def edge_based_segmentation(self, image, features=None):
         """Use edge detection to help identify person boundaries"""
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        gray = features.gray if features else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
         
         # Multiple edge detection
         edges1 = cv2.Canny(gray, 30, 100)
@@ -217,7 +396,17 @@ class TouristPhotoComposer:
         
         # Apply K-means clustering
         criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
-        _, labels, centers = cv2.kmeans(data, 4, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS)
+        if self.mask_scale >= 1.0:
+            _, labels, centers = cv2.kmeans(data, 4, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS)
+        else:
+            # Fit the centers on a downscaled copy, then label every pixel by its nearest center
+            small = cv2.resize(image, None, fx=self.mask_scale, fy=self.mask_scale, interpolation=cv2.INTER_AREA)
+            _, _, centers = cv2.kmeans(np.float32(small.reshape((-1, 3))), 4, None, criteria, 10,
+                                       cv2.KMEANS_RANDOM_CENTERS)
+            distances = np.empty((data.shape[0], len(centers)), np.float32)
+            for i, center in enumerate(centers):
+                distances[:, i] = ((data - center) ** 2).sum(axis=1)
+            labels = distances.argmin(axis=1)
         
         # Convert back to image shape
         labels = labels.reshape(image.shape[:2])
@@ -289,6 +478,30 @@ class TouristPhotoComposer:
         
         return combined
     
+    def compare_mask_quality(self, image, mask_scale):
+        """Time GrabCut, k-means and the combined mask at full size and at mask_scale, with IoU between them"""
+        methods = [
+            ('grabcut', self.grabcut_multi_init),
+            ('kmeans', self.color_clustering_mask),
+            ('combined', self.create_advanced_person_mask)
+        ]
+        saved_scale = self.mask_scale
+        report = {}
+        try:
+            for name, method in methods:
+                timings = []
+                masks = []
+                for scale in (1.0, mask_scale):
+                    self.mask_scale = scale
+                    cv2.setRNGSeed(0)
+                    start = time.perf_counter()
+                    masks.append(method(image))
+                    timings.append(time.perf_counter() - start)
+                report[name] = {'full_time': timings[0], 'scaled_time': timings[1], 'iou': mask_iou(*masks)}
+        finally:
+            self.mask_scale = saved_scale
+        return report
+    
     def create_clean_cutout(self, image, mask):
         """Create a clean cutout of the person with transparent background"""
         # Ensure mask is single channel
@@ -307,16 +520,44 @@ class TouristPhotoComposer:
         
         return result
     
-    def blend_person_into_background(self, person_cutout, background, position=(0, 0), scale=1.0):
-        """Blend person cutout into background with proper transparency"""
+    def blend_person_into_background(self, person_cutout, background, position=(0, 0), scale=1.0, out=None):
+        """Blend person cutout into background with proper transparency
+        
+        The composite is written into out (a new array if None). Only the
+        destination ROI is blended, in 16-bit fixed point.
+        """
+        prepared = self.prepare_cutout(person_cutout, scale)
+        return self.blend_prepared_cutout(prepared, background, position, out)
+    
+    def blend_person_into_backgrounds(self, person_cutout, backgrounds, position=(0, 0), scale=1.0, outputs=None):
+        """Blend one cutout into many backgrounds, resizing and premultiplying it only once"""
+        prepared = self.prepare_cutout(person_cutout, scale)
+        outputs = outputs or [None] * len(backgrounds)
+        return [self.blend_prepared_cutout(prepared, background, position, out)
+                for background, out in zip(backgrounds, outputs)]
+    
+    def prepare_cutout(self, person_cutout, scale=1.0):
+        """Resize the cutout and split it into alpha-premultiplied RGB and 255 - alpha (both uint16)"""
         # Resize person cutout if needed
         if scale != 1.0:
             new_width = int(person_cutout.shape[1] * scale)
             new_height = int(person_cutout.shape[0] * scale)
             person_cutout = cv2.resize(person_cutout, (new_width, new_height))
         
+        # (h, w, 1) alpha broadcasts over the RGB channels
+        alpha = person_cutout[:, :, 3:4].astype(np.uint16)
+        premultiplied = person_cutout[:, :, 0:3] * alpha
+        return premultiplied, 255 - alpha
+    
+    def blend_prepared_cutout(self, prepared, background, position, out=None):
+        premultiplied, inverse_alpha = prepared
+        if out is None:
+            out = background.copy()
+        elif out is not background:
+            np.copyto(out, background)
+        
         bg_height, bg_width = background.shape[:2]
-        person_height, person_width = person_cutout.shape[:2]
+        person_height, person_width = premultiplied.shape[:2]
         
         # Adjust position to fit
         x, y = position
@@ -328,78 +569,123 @@ class TouristPhotoComposer:
         actual_height = min(person_height, bg_height - y)
         
         if actual_width <= 0 or actual_height <= 0:
-            return background
+            return out
         
-        # Crop if necessary
-        person_crop = person_cutout[:actual_height, :actual_width]
+        # Blend: (person * alpha + background * (255 - alpha)) / 255
+        roi = out[y:y+actual_height, x:x+actual_width]
+        blended = roi * inverse_alpha[:actual_height, :actual_width]
+        blended += premultiplied[:actual_height, :actual_width]
         
-        # Extract alpha channel
-        alpha = person_crop[:,:,3].astype(float) / 255.0
-        alpha = np.stack([alpha] * 3, axis=2)  # Make 3-channel for RGB
+        # Rounded division by 255, exact for values up to 255 * 255
+        blended += 128
+        blended += blended >> 8
+        blended >>= 8
+        roi[...] = blended
         
-        # Get background region
-        bg_region = background[y:y+actual_height, x:x+actual_width].astype(float)
-        person_rgb = person_crop[:,:,0:3].astype(float)
-        
-        # Blend
-        blended = person_rgb * alpha + bg_region * (1 - alpha)
-        
-        # Create result
-        result = background.copy().astype(float)
-        result[y:y+actual_height, x:x+actual_width] = blended
-        
-        return result.astype(np.uint8)
+        return out
     
-    def process_individual_tourist_photos(self, source_images, source_paths, output_dir="individual_tourist_photos"):
-        """Create individual photos for each person at each tourist site"""
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        
-        # Load background images
+    def load_tourist_backgrounds(self):
+        """Download every tourist site and resize it to the standard 1200x800"""
         print("Loading tourist site backgrounds...")
         background_images = []
         site_names = []
         
         for i, site_url in enumerate(self.tourist_sites):
             print(f"  Loading site {i+1}/{len(self.tourist_sites)}: {self.site_names[i]}")
-            background = self.download_image(site_url)
+            if self.background_cache:
+                background = self.background_cache.fetch(site_url, (1200, 800), self.request_headers)
+            else:
+                background = self.download_image(site_url)
+                if background is not None:
+                    # Resize to standard size
+                    background = cv2.resize(background, (1200, 800))
             if background is not None:
-                # Resize to standard size
-                background = cv2.resize(background, (1200, 800))
                 background_images.append(background)
                 site_names.append(self.site_names[i])
             else:
                 print(f"    Failed to load {self.site_names[i]}")
         
+        return background_images, site_names
+    
+    def save_mask_report(self, person_mask, source_idx, output_dir):
+        """Save the debug mask and print coverage warnings"""
+        mask_debug_path = f"{output_dir}/debug_mask_{source_idx+1}.jpg"
+        cv2.imwrite(mask_debug_path, person_mask)
+        print(f"  Debug mask saved: {mask_debug_path}")
+        
+        # Check mask quality
+        coverage = np.sum(person_mask > 0) / (person_mask.shape[0] * person_mask.shape[1])
+        print(f"  Mask coverage: {coverage:.1%}")
+        
+        if coverage < 0.05:
+            print(f"  Warning: Very small mask detected, results may be poor")
+        elif coverage > 0.8:
+            print(f"  Warning: Very large mask detected, may include background")
+    
+    def compose_at_site(self, person_cutout, background, out=None, prepared_cutouts=None):
+        """Scale the cutout to fit the site and blend it into the lower center
+        
+        prepared_cutouts, if given, is a dict caching prepare_cutout results per
+        scale so same-size sites resize and premultiply the cutout only once.
+        """
+        # Calculate positioning and scale
+        bg_height, bg_width = background.shape[:2]
+        person_height, person_width = person_cutout.shape[:2]
+        
+        # Scale person to fit nicely (max 30% of background width)
+        max_person_width = bg_width * 0.3
+        max_person_height = bg_height * 0.5
+        
+        scale_w = max_person_width / person_width
+        scale_h = max_person_height / person_height
+        scale = min(scale_w, scale_h, 1.0)  # Don't upscale
+        
+        # Position in lower center area
+        new_width = int(person_width * scale)
+        new_height = int(person_height * scale)
+        
+        x = (bg_width - new_width) // 2  # Center horizontally
+        y = bg_height - new_height - 50   # 50 pixels from bottom
+        
+        # Create the composite
+        if prepared_cutouts is None:
+            return self.blend_person_into_background(
+                person_cutout, background, 
+                position=(x, y), scale=scale, out=out
+            )
+        if scale not in prepared_cutouts:
+            prepared_cutouts[scale] = self.prepare_cutout(person_cutout, scale)
+        return self.blend_prepared_cutout(prepared_cutouts[scale], background, (x, y), out)
+    
+    def process_individual_tourist_photos(self, source_images, source_paths, output_dir="individual_tourist_photos", workers=1):
+        """Create individual photos for each person at each tourist site"""
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        
+        # Load background images
+        background_images, site_names = self.load_tourist_backgrounds()
+        
         if not background_images:
             print("No background images loaded successfully!")
             return []
         
         print(f"Successfully loaded {len(background_images)} tourist sites")
         
+        if workers > 1:
+            return self.process_tourist_photos_parallel(source_images, source_paths, background_images,
+                                                        site_names, output_dir, workers)
+        
         results = []
         
         # Process each source image
         for source_idx, (source_img, source_path) in enumerate(zip(source_images, source_paths)):
             print(f"\nProcessing {source_path}...")
             
-            # Extract person mask
+            # Extract person mask (seeded so k-means/GrabCut match the parallel mode)
             print("  Creating person mask...")
+            cv2.setRNGSeed(source_idx)
             person_mask = self.create_advanced_person_mask(source_img)
-            
-            # Save debug mask
-            mask_debug_path = f"{output_dir}/debug_mask_{source_idx+1}.jpg"
-            cv2.imwrite(mask_debug_path, person_mask)
-            print(f"  Debug mask saved: {mask_debug_path}")
-            
-            # Check mask quality
-            coverage = np.sum(person_mask > 0) / (person_mask.shape[0] * person_mask.shape[1])
-            print(f"  Mask coverage: {coverage:.1%}")
-            
-            if coverage < 0.05:
-                print(f"  Warning: Very small mask detected, results may be poor")
-            elif coverage > 0.8:
-                print(f"  Warning: Very large mask detected, may include background")
+            self.save_mask_report(person_mask, source_idx, output_dir)
             
             # Create clean person cutout
             person_cutout = self.create_clean_cutout(source_img, person_mask)
@@ -407,34 +693,14 @@ class TouristPhotoComposer:
             # Extract base filename
             base_name = os.path.splitext(os.path.basename(source_path))[0]
             
-            # Place person at each tourist site
+            # Place person at each tourist site, reusing one output buffer
+            prepared_cutouts = {}
+            result_img = None
             for bg_idx, (background, site_name) in enumerate(zip(background_images, site_names)):
                 print(f"    Creating photo at {site_name}...")
-                
-                # Calculate positioning and scale
-                bg_height, bg_width = background.shape[:2]
-                person_height, person_width = person_cutout.shape[:2]
-                
-                # Scale person to fit nicely (max 30% of background width)
-                max_person_width = bg_width * 0.3
-                max_person_height = bg_height * 0.5
-                
-                scale_w = max_person_width / person_width
-                scale_h = max_person_height / person_height
-                scale = min(scale_w, scale_h, 1.0)  # Don't upscale
-                
-                # Position in lower center area
-                new_width = int(person_width * scale)
-                new_height = int(person_height * scale)
-                
-                x = (bg_width - new_width) // 2  # Center horizontally
-                y = bg_height - new_height - 50   # 50 pixels from bottom
-                
-                # Create the composite
-                result_img = self.blend_person_into_background(
-                    person_cutout, background, 
-                    position=(x, y), scale=scale
-                )
+                if result_img is None or result_img.shape != background.shape:
+                    result_img = np.empty_like(background)
+                result_img = self.compose_at_site(person_cutout, background, result_img, prepared_cutouts)
                 
                 # Save individual photo
                 output_filename = f"{base_name}_at_{site_name}.jpg"
@@ -444,14 +710,104 @@ class TouristPhotoComposer:
                 results.append(output_path)
                 print(f"      Saved: {output_filename}")
         
+        self.print_stage_timings()
         return results
+    
+    def process_tourist_photos_parallel(self, source_images, source_paths, background_images, site_names,
+                                        output_dir, workers):
+        """Masks on a process pool, composites fanned out across sites, writes on a bounded writer thread"""
+        results = []
+        
+        # Composites are collected in submission order so output stays deterministic,
+        # and at most max_pending composites and max_pending writes are in flight at once
+        max_pending = workers * 2
+        pending = deque()
+        writes = deque()
+        
+        def finish_writes(limit):
+            while len(writes) > limit:
+                output_path, future = writes.popleft()
+                future.result()  # A failed write raises here instead of stalling the pool loop
+                results.append(output_path)
+                print(f"      Saved: {os.path.basename(output_path)}")
+        
+        def drain(limit):
+            while len(pending) > limit:
+                output_path, async_result = pending.popleft()
+                writes.append((output_path, writer.submit(write_encoded_output, output_path, async_result.get())))
+                finish_writes(max_pending)
+        
+        with ThreadPoolExecutor(max_workers=1) as writer, \
+                Pool(processes=workers, initializer=init_composer_worker,
+                     initargs=(background_images, self.mask_scale)) as pool:
+            masks = pool.imap(mask_task, enumerate(source_images))
+            for source_idx, (source_img, source_path, (person_mask, timings)) in enumerate(zip(source_images, source_paths, masks)):
+                print(f"\nProcessing {source_path}...")
+                self.add_stage_timings(timings)
+                self.save_mask_report(person_mask, source_idx, output_dir)
+                
+                person_cutout = self.create_clean_cutout(source_img, person_mask)
+                base_name = os.path.splitext(os.path.basename(source_path))[0]
+                
+                for bg_idx, site_name in enumerate(site_names):
+                    print(f"    Creating photo at {site_name}...")
+                    output_path = os.path.join(output_dir, f"{base_name}_at_{site_name}.jpg")
+                    pending.append((output_path, pool.apply_async(composite_task, ((person_cutout, bg_idx),))))
+                    drain(max_pending)
+            drain(0)
+            finish_writes(0)
+        
+        self.print_stage_timings()
+        return results
+
+# Per-process state for the parallel mode
+WORKER_STATE = {}
+
+def init_composer_worker(background_images, mask_scale):
+    """Pool initializer: one composer and one copy of the backgrounds per process"""
+    cv2.setNumThreads(1)  # The pool already uses every core
+    WORKER_STATE['composer'] = TouristPhotoComposer(mask_scale)
+    WORKER_STATE['backgrounds'] = background_images
+
+def mask_task(args):
+    source_idx, source_img = args
+    cv2.setRNGSeed(source_idx)
+    timings = {}
+    person_mask = WORKER_STATE['composer'].create_advanced_person_mask(source_img, timings)
+    return person_mask, timings
+
+def composite_task(args):
+    """Blend one cutout into one site and return the encoded JPEG bytes"""
+    person_cutout, bg_idx = args
+    result_img = WORKER_STATE['composer'].compose_at_site(person_cutout, WORKER_STATE['backgrounds'][bg_idx])
+    _, encoded = cv2.imencode('.jpg', cv2.cvtColor(result_img, cv2.COLOR_RGB2BGR))
+    return encoded.tobytes()
+
+def write_encoded_output(output_path, data):
+    """Writer thread task: save one encoded image"""
+    with open(output_path, 'wb') as f:
+        f.write(data)
 
 def main():
+    parser = argparse.ArgumentParser(description='Place people from photos at famous tourist sites')
+    parser.add_argument('images', nargs='*', help='Source photos (default: result.png ... result (5).png)')
+    parser.add_argument('-o', '--output', default='individual_tourist_photos', help='Output directory')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for masking and compositing')
+    parser.add_argument('--mask-scale', type=float, default=1.0,
+                        help='Segmentation resolution (0-1]; lower is faster, 1.0 is full quality')
+    parser.add_argument('--mask-benchmark', action='store_true',
+                        help='Compare mask speed and IoU at --mask-scale against full resolution, then exit')
+    parser.add_argument('--cache-dir', default='background_cache', help='Directory for cached backgrounds')
+    parser.add_argument('--no-cache', action='store_true', help='Download every background on every run')
+    parser.add_argument('--offline', action='store_true', help='Use cached backgrounds without revalidating them')
+    args = parser.parse_args()
+    
     # Initialize the composer
-    composer = TouristPhotoComposer()
+    background_cache = None if args.no_cache else BackgroundCache(args.cache_dir, args.offline)
+    composer = TouristPhotoComposer(args.mask_scale, background_cache)
     
     # Load your source images
-    source_image_paths = [
+    source_image_paths = args.images or [
         "result.png", 
         "result (1).png", 
         "result (2).png", 
@@ -472,14 +828,24 @@ def main():
     
     print(f"\n✅ Loaded {len(source_images)} source images")
     
+    if args.mask_benchmark:
+        print(f"\n⏱️ Mask quality at scale {args.mask_scale} vs full resolution:")
+        for path, image in zip(valid_paths, source_images):
+            print(f"  {path}")
+            for name, stats in composer.compare_mask_quality(image, args.mask_scale).items():
+                speedup = stats['full_time'] / stats['scaled_time'] if stats['scaled_time'] else 0
+                print(f"    {name:9s} full {stats['full_time']:.2f}s  scaled {stats['scaled_time']:.2f}s  "
+                      f"({speedup:.1f}x)  IoU {stats['iou']:.3f}")
+        return
+    
     print("\n🏛️ Creating individual tourist photos...")
     print("This will create separate photos of each person at each tourist site")
     
     # Create individual photos
-    results = composer.process_individual_tourist_photos(source_images, valid_paths)
+    results = composer.process_individual_tourist_photos(source_images, valid_paths, args.output, args.workers)
     
     print(f"\n🎉 Created {len(results)} individual tourist photos!")
-    print(f"\n📁 Check the 'individual_tourist_photos' folder for:")
+    print(f"\n📁 Check the '{args.output}' folder for:")
     print("  - debug_mask_*.jpg (shows what areas were detected as people)")
     print("  - *_at_*.jpg (individual photos at each tourist site)")
     